@@ -0,0 +1,546 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the hacking mini-game
+Times board generation, guess evaluation, brackets and rendering, writes the
+results as JSON and compares two result files to flag regressions.
+
+    python bench/hacking_bench.py --out before.json
+    python bench/hacking_bench.py --out after.json --compare before.json
+    python bench/hacking_bench.py --compare before.json after.json
+"""
+
+import argparse
+import compileall
+import copy
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import curses
+
+import hacking_ui
+from hacking_game import (DEFAULT_GEOMETRY, DIFFICULTY_CONFIG, KEY_DOWN, KEY_RIGHT, WORD_LISTS, Geometry,
+                          HackingGame, build_grid, draw_filler, generate_board, handle_key, select_words)
+from hacking_cache import BoardCache
+from hacking_replay import EventLogWriter, GameMemo, read_log, replay
+from hacking_solver import likeness_table
+from hacking_ui import GridRenderer, draw_grid
+
+# name -> function(n) returning (seconds for n operations, extra counters)
+BENCHMARKS: Dict[str, Callable[[int], Tuple[float, Optional[dict]]]] = {}
+DEFAULT_OPS = {}  # name -> operations per repeat
+
+
+def bench(name: str, ops: int):
+    def register(func):
+        BENCHMARKS[name] = func
+        DEFAULT_OPS[name] = ops
+        return func
+    return register
+
+
+class FakeScreen:
+    """In-memory stand-in for a curses window that counts what is drawn"""
+
+    def __init__(self):
+        self.calls = 0
+        self.chars = 0
+
+    def addstr(self, row: int, col: int, text: str, attr: int = 0):
+        self.calls += 1
+        self.chars += len(text)
+
+    def move(self, row: int, col: int):
+        self.calls += 1
+
+    def clrtoeol(self):
+        self.calls += 1
+
+    def erase(self):
+        self.calls += 1
+
+    clear = erase
+
+    def noutrefresh(self):
+        pass
+
+    refresh = noutrefresh
+
+
+class FakeRenderer(GridRenderer):
+    """GridRenderer that doesn't need an initialised terminal"""
+
+    renders = 0
+
+    def render(self, stdscr, game: HackingGame):
+        FakeRenderer.renders += 1
+        super().render(stdscr, game)
+
+    def flush(self, stdscr):
+        pass
+
+
+class KeyScreen(FakeScreen):
+    """FakeScreen whose keys are all already waiting, like a key-repeat backlog.
+
+    A None in keys reads as no key pending, ending the batch.
+    """
+
+    def __init__(self, keys: List[Optional[int]]):
+        super().__init__()
+        self.keys = keys
+        self.next_key = 0
+
+    def timeout(self, ms: int):
+        pass
+
+    def getch(self) -> int:
+        if self.next_key == len(self.keys):
+            return -1
+        self.next_key += 1
+        key = self.keys[self.next_key - 1]
+        return -1 if key is None else key
+
+
+def _game_init(difficulty: int):
+    def run(n: int):
+        started = time.perf_counter()
+        for i in range(n):
+            HackingGame(difficulty, seed=i)
+        return time.perf_counter() - started, None
+    return run
+
+
+for _difficulty in sorted(DIFFICULTY_CONFIG):
+    bench(f'game_init_d{_difficulty}', 200)(_game_init(_difficulty))
+
+
+@bench('build_grid_d3', 500)
+def bench_build_grid(n: int):
+    rng = random.Random(0)
+    words, password = select_words(DIFFICULTY_CONFIG[3], WORD_LISTS, rng)
+    lines = DEFAULT_GEOMETRY.num_lines
+    filler = draw_filler(rng, lines * DEFAULT_GEOMETRY.content_length)
+    address_bits = rng.getrandbits(16 * lines)
+    started = time.perf_counter()
+    for _ in range(n):
+        build_grid(words, password, 3, filler, address_bits, rng)
+    return time.perf_counter() - started, None
+
+
+@bench('generate_board_d3', 200)
+def bench_generate_board(n: int):
+    started = time.perf_counter()
+    for i in range(n):
+        generate_board(3, seed=i)
+    return time.perf_counter() - started, None
+
+
+@bench('board_cache_hit', 500)
+def bench_board_cache_hit(n: int):
+    # Seeded boards loaded from the on-disk cache instead of generated (compare generate_board)
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = BoardCache(os.path.join(tmp, 'boards.db'))
+        for i in range(n):
+            cache.board(3, i)
+        started = time.perf_counter()
+        for i in range(n):
+            cache.board(3, i)
+        elapsed = time.perf_counter() - started
+        record_bytes = cache.size / len(cache)
+        cache.close()
+    return elapsed, {'bytes_per_board': record_bytes}
+
+
+_replay_logs = {}  # (games, seeds) -> path of a log written once per run
+REPLAY_KEYS = [9, 9, 9, KEY_DOWN, KEY_RIGHT, 10]  # Tab to a word or bracket, nudge, Enter
+
+
+def _replay_log(num_games: int, num_seeds: int) -> str:
+    """Log of short games like a server's, spread over num_seeds puzzles (daily or shared seeds)"""
+    path = _replay_logs.get((num_games, num_seeds))
+    if path is None:
+        path = os.path.join(tempfile.mkdtemp(), 'games.log')
+        writer = EventLogWriter(path)
+        rng = random.Random(0)
+        for i in range(num_games):
+            game = HackingGame(3, record_events=True, seed=i % num_seeds)
+            for _ in range(30):
+                handle_key(game, rng.choice(REPLAY_KEYS))
+                if game.game_over:
+                    break
+            writer.write(game)
+        writer.close()
+        _replay_logs[(num_games, num_seeds)] = path
+    return path
+
+
+def _replay(num_seeds: Optional[int]):
+    def run(n: int):
+        path = _replay_log(n, num_seeds or n)
+        memo = GameMemo()
+        events = 0
+        started = time.perf_counter()
+        for record in read_log(path):
+            replay(record, memo=memo)
+            events += len(record)
+        elapsed = time.perf_counter() - started
+        return elapsed, {'events_per_game': events / n, 'events_per_s': events / elapsed}
+    return run
+
+
+# Games per op; daily puzzles share a handful of seeds, unique seeds rebuild every board
+bench('replay_daily_seeds', 2000)(_replay(50))
+bench('replay_unique_seeds', 500)(_replay(None))
+
+
+@bench('count_matches', 100000)
+def bench_count_matches(n: int):
+    game = HackingGame(5, seed=0)
+    words = game.words
+    count = game.count_matches
+    started = time.perf_counter()
+    for i in range(n):
+        count(words[i % len(words)])
+    return time.perf_counter() - started, None
+
+
+@bench('make_guess', 50000)
+def bench_make_guess(n: int):
+    # Very easy games never lock out, so one game takes every guess
+    game = HackingGame(1, seed=0)
+    duds = [w for w in game.words if w != game.password]
+    guess = game.make_guess
+    started = time.perf_counter()
+    for i in range(n):
+        guess(duds[i % len(duds)])
+    return time.perf_counter() - started, None
+
+
+def _likeness_table(n_words: int, use_numpy: bool):
+    # n_words x n_words likeness, against count_matches over a sample of the same pairs
+    def run(n: int):
+        rng = random.Random(0)
+        words = [''.join(rng.choices('ABCDEFGHIJKLMNOPQRSTUVWXYZ', k=rng.randint(4, 15)))
+                 for _ in range(n_words)]
+        game = HackingGame(1, seed=0)
+        sample = 100000
+        started = time.perf_counter()
+        for i in range(sample):
+            game.password = words[i % n_words]
+            game.count_matches(words[(i * 7919) % n_words])
+        loop_per_pair = (time.perf_counter() - started) / sample
+        started = time.perf_counter()
+        for _ in range(n):
+            likeness_table(words, words, use_numpy)
+        elapsed = time.perf_counter() - started
+        pairs = n * n_words * n_words
+        return elapsed, {'pairs_per_s': pairs / elapsed, 'speedup_vs_count_matches': loop_per_pair * pairs / elapsed}
+    return run
+
+
+bench('likeness_table_10k', 1)(_likeness_table(10000, True))
+bench('likeness_table_10k_pure', 1)(_likeness_table(10000, False))
+
+
+@bench('activate_bracket', 5000)
+def bench_activate_bracket(n: int):
+    # A bracket can only be used once, so every call gets its own bracket
+    targets = []
+    seed = 0
+    while len(targets) < n:
+        game = HackingGame(1, seed=seed)
+        seed += 1
+        for line_idx in sorted(game.bracket_lines):
+            targets.append((game, line_idx, min(game.grid_lines[line_idx].brackets())))
+    targets = targets[:n]
+    started = time.perf_counter()
+    for game, row, col in targets:
+        game.cursor_row = row
+        game.cursor_col = col
+        game.activate_bracket()
+    return time.perf_counter() - started, None
+
+
+@bench('get_current_highlight', 100000)
+def bench_highlight(n: int):
+    game = HackingGame(3, seed=0)
+    cells = [(row, col) for row in range(len(game.grid_lines)) for col in range(game.line_length)]
+    highlight = game.get_current_highlight
+    started = time.perf_counter()
+    for i in range(n):
+        game.cursor_row, game.cursor_col = cells[i % len(cells)]
+        highlight()
+    return time.perf_counter() - started, None
+
+
+@bench('draw_grid', 2000)
+def bench_draw_grid(n: int):
+    game = HackingGame(3, seed=0)
+    screen = FakeScreen()
+    started = time.perf_counter()
+    for _ in range(n):
+        draw_grid(screen, game, 5)
+    elapsed = time.perf_counter() - started
+    return elapsed, {'calls_per_frame': screen.calls / n, 'chars_per_frame': screen.chars / n}
+
+
+@bench('render_cursor_move', 5000)
+def bench_render_move(n: int):
+    # Damage-tracked frames after a cursor move, the common case while playing
+    game = HackingGame(3, seed=0)
+    screen = FakeScreen()
+    renderer = FakeRenderer(5)
+    renderer.render(screen, game)
+    screen.calls = screen.chars = 0
+    started = time.perf_counter()
+    for i in range(n):
+        game.cursor_row = (i * 2) % len(game.grid_lines)
+        renderer.render(screen, game)
+    elapsed = time.perf_counter() - started
+    return elapsed, {'calls_per_frame': screen.calls / n, 'chars_per_frame': screen.chars / n}
+
+
+@bench('play_key_backlog', 2000)
+def bench_play_key_backlog(n: int):
+    # Held arrow keys queued up behind a slow frame: one batch, one redraw
+    game = HackingGame(3, seed=0)
+    screen = KeyScreen([KEY_DOWN, KEY_RIGHT] * (n // 2) + [None, ord('q')])
+    FakeRenderer.renders = 0
+    renderer_class, hacking_ui.GridRenderer = hacking_ui.GridRenderer, FakeRenderer
+    try:
+        started = time.perf_counter()
+        hacking_ui.play(screen, game, fps=0)
+        elapsed = time.perf_counter() - started
+    finally:
+        hacking_ui.GridRenderer = renderer_class
+    return elapsed, {'redraws': FakeRenderer.renders - 1}
+
+
+def _bracket_game(geometry: Geometry = DEFAULT_GEOMETRY) -> HackingGame:
+    # Cursor on a bracket, so every branch has a line to change
+    game = HackingGame(3, seed=0, geometry=geometry)
+    row = min(game.bracket_lines)
+    game.move_cursor(row, min(game.grid_lines[row].brackets()))
+    return game
+
+
+@bench('branch_deepcopy', 200)
+def bench_branch_deepcopy(n: int):
+    # What branching a game cost before snapshots
+    game = _bracket_game()
+    started = time.perf_counter()
+    for _ in range(n):
+        copy.deepcopy(game).activate_bracket()
+    return time.perf_counter() - started, None
+
+
+@bench('branch_fork', 5000)
+def bench_branch_fork(n: int):
+    game = _bracket_game()
+    started = time.perf_counter()
+    for _ in range(n):
+        game.fork().activate_bracket()
+    return time.perf_counter() - started, None
+
+
+def _snapshot_restore(geometry: Geometry):
+    def run(n: int):
+        game = _bracket_game(geometry)
+        started = time.perf_counter()
+        for _ in range(n):
+            snapshot = game.snapshot()
+            game.activate_bracket()
+            game.restore(snapshot)
+        return time.perf_counter() - started, None
+    return run
+
+
+# Boards 10x and 100x the default size: per-line costs should stay flat
+SCALES = (1, 10, 100)
+
+
+def _scaled(scale: int) -> Geometry:
+    return Geometry(DEFAULT_GEOMETRY.num_rows * scale, DEFAULT_GEOMETRY.num_columns,
+                    DEFAULT_GEOMETRY.content_length)
+
+
+def _generate_scaled(scale: int):
+    def run(n: int):
+        geometry = _scaled(scale)
+        started = time.perf_counter()
+        for i in range(n):
+            generate_board(3, seed=i, geometry=geometry)
+        elapsed = time.perf_counter() - started
+        return elapsed, {'lines': geometry.num_lines, 'us_per_line': 1e6 * elapsed / n / geometry.num_lines}
+    return run
+
+
+def _game_init_scaled(scale: int):
+    def run(n: int):
+        geometry = _scaled(scale)
+        started = time.perf_counter()
+        for i in range(n):
+            HackingGame(3, seed=i, geometry=geometry)
+        elapsed = time.perf_counter() - started
+        return elapsed, {'lines': geometry.num_lines, 'us_per_line': 1e6 * elapsed / n / geometry.num_lines}
+    return run
+
+
+def _lookups_scaled(scale: int):
+    # Arrow moves, Tab jumps, highlight and word lookups over the whole grid
+    def run(n: int):
+        game = HackingGame(3, seed=0, geometry=_scaled(scale))
+        keys = [curses.KEY_DOWN, curses.KEY_RIGHT, 9, curses.KEY_RIGHT]
+        started = time.perf_counter()
+        for i in range(n):
+            handle_key(game, keys[i % len(keys)])
+            game.get_current_highlight()
+            game.get_current_word()
+        return time.perf_counter() - started, None
+    return run
+
+
+for _scale in SCALES:
+    bench(f'generate_board_d3_x{_scale}', max(2, 200 // _scale))(_generate_scaled(_scale))
+    bench(f'game_init_d3_x{_scale}', max(2, 200 // _scale))(_game_init_scaled(_scale))
+    bench(f'lookups_x{_scale}', 50000)(_lookups_scaled(_scale))
+    bench(f'branch_snapshot_restore_x{_scale}', 5000)(_snapshot_restore(_scaled(_scale)))
+
+
+# Cold start of each mode in a fresh interpreter; the interactive and server
+# modes need a terminal or a port, so only their imports are started
+STARTUP_MODES = {
+    'help': ['fallout_hacking.py', '--help'],
+    'simulate': ['fallout_hacking.py', '--simulate', '1', '-d1', '--seed', '0'],
+    'simulate_solver': ['fallout_hacking.py', '--simulate', '1', '-d1', '--seed', '0', '--strategy', 'minimax'],
+    'play_imports': ['-c', 'import fallout_hacking, hacking_ui'],
+    'serve_imports': ['-c', 'import fallout_hacking, hacking_server'],
+}
+
+
+def import_profile(argv: List[str]) -> dict:
+    """Total import time and notable modules of one run under python -X importtime"""
+    proc = subprocess.run([sys.executable, '-X', 'importtime'] + argv, cwd=ROOT,
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    total_us = 0
+    modules = set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        modules.add(name.strip())
+        if not name.startswith('  '):  # Nested imports are indented and already counted
+            total_us += int(cumulative)
+    return {'import_ms': total_us / 1000.0, 'modules': len(modules),
+            'curses': int('curses' in modules), 'numpy': int('numpy' in modules)}
+
+
+def _startup(argv: List[str]):
+    def run(n: int):
+        compileall.compile_dir(ROOT, maxlevels=0, quiet=1)  # Time imports, not compiling
+        started = time.perf_counter()
+        for _ in range(n):
+            subprocess.run([sys.executable] + argv, cwd=ROOT, stdout=subprocess.DEVNULL, check=True)
+        return time.perf_counter() - started, import_profile(argv)
+    return run
+
+
+for _mode, _argv in STARTUP_MODES.items():
+    bench(f'startup_{_mode}', 10)(_startup(_argv))
+
+
+def run_benchmarks(names: List[str], repeat: int, scale: float) -> dict:
+    results = {}
+    for name in names:
+        ops = max(1, int(DEFAULT_OPS[name] * scale))
+        times = []
+        extra = None
+        for _ in range(repeat):
+            elapsed, extra = BENCHMARKS[name](ops)
+            times.append(elapsed / ops)
+        times.sort()
+        results[name] = {
+            'ops': ops,
+            'repeat': repeat,
+            'best_us': 1e6 * times[0],
+            'median_us': 1e6 * times[len(times) // 2],
+        }
+        if extra:
+            results[name].update(extra)
+        counters = ''.join(f"  {key} {value:g}" for key, value in (extra or {}).items())
+        print(f"{name:24} {results[name]['median_us']:12.3f} us/op  (best {results[name]['best_us']:.3f}){counters}")
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'machine': platform.machine(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+
+
+def compare(base: dict, new: dict, threshold: float) -> bool:
+    """Print per-benchmark changes; returns True if anything got slower than threshold"""
+    regressed = False
+    print(f"{'benchmark':24} {'base us':>12} {'new us':>12} {'change':>9}")
+    for name, result in new['results'].items():
+        old = base['results'].get(name)
+        if old is None:
+            print(f"{name:24} {'-':>12} {result['median_us']:12.3f}       new")
+            continue
+        change = result['median_us'] / old['median_us'] - 1.0
+        flag = ''
+        if change > threshold:
+            flag = '  REGRESSION'
+            regressed = True
+        elif change < -threshold:
+            flag = '  faster'
+        print(f"{name:24} {old['median_us']:12.3f} {result['median_us']:12.3f} {change:+8.1%}{flag}")
+    return regressed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmarks for fallout_hacking.py')
+    parser.add_argument('-k', '--filter', default='', help='Only run benchmarks whose name contains this')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per benchmark (median is reported)')
+    parser.add_argument('--scale', type=float, default=1.0, help='Multiply the operations per run')
+    parser.add_argument('--out', metavar='JSON', help='Write the results here')
+    parser.add_argument('--compare', nargs='+', metavar='JSON',
+                        help='Baseline results to compare against; with two files, compare them without running')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='Relative slowdown reported as a regression (default 0.10)')
+    parser.add_argument('--list', action='store_true', help='List the benchmarks and exit')
+    args = parser.parse_args()
+
+    if args.list:
+        print('\n'.join(BENCHMARKS))
+        sys.exit(0)
+
+    if args.compare and len(args.compare) == 2:
+        with open(args.compare[0]) as f:
+            base = json.load(f)
+        with open(args.compare[1]) as f:
+            new = json.load(f)
+        sys.exit(1 if compare(base, new, args.threshold) else 0)
+
+    names = [name for name in BENCHMARKS if args.filter in name]
+    results = run_benchmarks(names, args.repeat, args.scale)
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare[0]) as f:
+            base = json.load(f)
+        print()
+        sys.exit(1 if compare(base, results, args.threshold) else 0)
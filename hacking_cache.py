@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+On-disk cache of generated boards for the hacking mini-game
+A board is a pure function of its seed, difficulty, geometry, word list and
+the generator itself, so seeded boards (daily puzzles, replays, shared
+challenges) are stored once in a SQLite file under a hash of those inputs
+and loaded back without running the generator. The least recently used
+boards are evicted once the file's boards exceed a size limit.
+
+Board record layout (all integers little-endian, zlib-compressed):
+    9 bytes   header: format (u8), difficulty (u8), rows, columns, line length (u16 each),
+              word count (u8)
+    W x 11    one per word, in board order: grid line (u16), word start (u16), word length (u8),
+              password (u8), bracket start, bracket end (u16 each, 0xFFFF if none), pair (u8)
+    L x 2     address of every grid line (u16)
+    ...       every line's characters, line after line
+"""
+
+import hashlib
+import sqlite3
+import struct
+import sys
+import time
+import zlib
+from typing import Optional
+
+from hacking_game import (BRACKET_PAIRS, DEFAULT_GEOMETRY, GENERATOR_VERSION, WORD_LISTS, Board, Geometry,
+                          GridLine, generate_board)
+from hacking_words import word_index
+
+RECORD_FORMAT = 1
+_HEADER = struct.Struct('<BBHHHB')
+_WORD = struct.Struct('<HHBBHHB')
+NO_BRACKET = 0xFFFF
+DEFAULT_MAX_BYTES = 64 << 20
+EVICT_TO = 0.9  # Eviction frees space down to this fraction of the limit
+TOUCH_BATCH = 64  # Hits whose last-used times are written together
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS boards (
+    key BLOB PRIMARY KEY,
+    data BLOB NOT NULL,
+    used INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS boards_used ON boards (used);
+'''
+
+
+def pack_board(board: Board) -> bytes:
+    """Serialise a freshly generated board (no duds removed, no brackets used)"""
+    geometry = board.geometry
+    lines = board.grid_lines
+    word_lines = {line.word: i for i, line in enumerate(lines) if line.word}
+    parts = [_HEADER.pack(RECORD_FORMAT, board.difficulty, geometry.num_rows, geometry.num_columns,
+                          geometry.content_length, len(board.words))]
+    for word in board.words:
+        line = lines[word_lines[word]]
+        if line.bracket_info is not None:
+            start, end, pair = line.bracket_info
+            bracket = (start, end, BRACKET_PAIRS.index(pair))
+        else:
+            bracket = (NO_BRACKET, NO_BRACKET, 0)
+        parts.append(_WORD.pack(word_lines[word], line.word_start, len(word), word == board.password, *bracket))
+    parts.append(struct.pack('<%dH' % len(lines), *(int(line.address, 16) for line in lines)))
+    parts.extend(line.content.encode('latin-1') for line in lines)
+    return zlib.compress(b''.join(parts))
+
+
+def unpack_board(data: bytes, seed: Optional[int] = None) -> Board:
+    """Rebuild the board pack_board stored"""
+    data = zlib.decompress(data)
+    fmt, difficulty, num_rows, num_columns, content_length, num_words = _HEADER.unpack_from(data)
+    if fmt != RECORD_FORMAT:
+        raise ValueError(f"unknown board record format {fmt}")
+    geometry = Geometry(num_rows, num_columns, content_length)
+    num_lines = geometry.num_lines
+    pos = _HEADER.size + num_words * _WORD.size
+    addresses = struct.unpack_from('<%dH' % num_lines, data, pos)
+    pos += 2 * num_lines
+    cells = data[pos:pos + num_lines * content_length]
+    from_cells = GridLine.from_cells
+    lines = [from_cells(addresses[i], cells[i * content_length:(i + 1) * content_length])
+             for i in range(num_lines)]
+
+    words = []
+    password = None
+    for line_idx, word_start, length, is_password, start, end, pair in _WORD.iter_unpack(
+            data[_HEADER.size:_HEADER.size + num_words * _WORD.size]):
+        line = lines[line_idx]
+        offset = line_idx * content_length + word_start
+        word = cells[offset:offset + length].decode('latin-1')
+        line.word = word
+        line.word_start = word_start
+        line.is_dud = not is_password
+        if start != NO_BRACKET:
+            line.bracket_info = (start, end, BRACKET_PAIRS[pair])
+        if is_password:
+            password = word
+        words.append(word)
+    return Board(difficulty, words, password, lines, seed, geometry)
+
+
+def board_key(difficulty: int, seed: int, word_lists=None, geometry: Optional[Geometry] = None) -> bytes:
+    """Content address of a board: everything generate_board's output depends on"""
+    geometry = geometry or DEFAULT_GEOMETRY
+    digest = word_index(word_lists if word_lists is not None else WORD_LISTS).digest()
+    inputs = f'{GENERATOR_VERSION}/{difficulty}/{geometry.num_rows}x{geometry.num_columns}x' \
+             f'{geometry.content_length}/{seed}/'.encode('ascii')
+    return hashlib.sha256(inputs + digest).digest()[:16]
+
+
+class BoardCache:
+    """Seeded boards in a SQLite file, evicting the least recently used past max_bytes"""
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.db = sqlite3.connect(path, isolation_level=None)  # Autocommit: every statement is durable
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.executescript(_SCHEMA)
+        self.size = self._stored_bytes()
+        self._touched = {}  # key -> last use not written yet
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _stored_bytes(self) -> int:
+        return self.db.execute('SELECT COALESCE(SUM(LENGTH(data)), 0) FROM boards').fetchone()[0]
+
+    def __len__(self) -> int:
+        return self.db.execute('SELECT COUNT(*) FROM boards').fetchone()[0]
+
+    def get(self, difficulty: int, seed: int, word_lists=None,
+            geometry: Optional[Geometry] = None) -> Optional[Board]:
+        """The cached board, or None"""
+        key = board_key(difficulty, seed, word_lists, geometry)
+        row = self.db.execute('SELECT data FROM boards WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._touched[key] = time.time_ns()
+        if len(self._touched) >= TOUCH_BATCH:
+            self._write_touched()
+        return unpack_board(row[0], seed)
+
+    def _write_touched(self):
+        # One transaction for a batch of hits instead of a write per hit
+        if self._touched:
+            self.db.execute('BEGIN')
+            self.db.executemany('UPDATE boards SET used = ? WHERE key = ?',
+                                [(used, key) for key, used in self._touched.items()])
+            self.db.execute('COMMIT')
+            self._touched.clear()
+
+    def put(self, board: Board, word_lists=None):
+        """Store a freshly generated board (it must have a seed)"""
+        if board.seed is None:
+            raise ValueError("only seeded boards can be cached")
+        key = board_key(board.difficulty, board.seed, word_lists, board.geometry)
+        data = pack_board(board)
+        self.db.execute('BEGIN')
+        old = self.db.execute('SELECT LENGTH(data) FROM boards WHERE key = ?', (key,)).fetchone()
+        self.db.execute('INSERT OR REPLACE INTO boards (key, data, used) VALUES (?, ?, ?)',
+                        (key, data, time.time_ns()))
+        self.db.execute('COMMIT')
+        self.size += len(data) - (old[0] if old is not None else 0)  # A replaced board's bytes are freed
+        if self.size > self.max_bytes:
+            self._evict()
+
+    def _evict(self):
+        # Other processes may share the file, so count again before deleting anything
+        self._write_touched()
+        self.size = self._stored_bytes()
+        target = int(self.max_bytes * EVICT_TO)
+        while self.size > target:
+            rows = self.db.execute('SELECT key, LENGTH(data) FROM boards ORDER BY used LIMIT 256').fetchall()
+            if not rows:
+                break
+            doomed = []
+            for key, size in rows:
+                if self.size <= target:
+                    break
+                doomed.append((key,))
+                self.size -= size
+            self.db.execute('BEGIN')
+            self.db.executemany('DELETE FROM boards WHERE key = ?', doomed)
+            self.db.execute('COMMIT')
+            self.evictions += len(doomed)
+
+    def board(self, difficulty: int, seed: int, word_lists=None,
+              geometry: Optional[Geometry] = None) -> Board:
+        """The board for a seed: loaded from the cache, or generated and stored"""
+        board = self.get(difficulty, seed, word_lists, geometry)
+        if board is None:
+            board = generate_board(difficulty, word_lists, seed, geometry)
+            self.put(board, word_lists)
+        return board
+
+    def stats(self) -> dict:
+        return {'boards': len(self), 'bytes': self.size, 'max_bytes': self.max_bytes,
+                'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
+
+    def close(self):
+        self._write_touched()
+        self.db.close()
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 2:
+        print("Syntax: hacking_cache.py CACHE")
+        sys.exit(2)
+    cache = BoardCache(sys.argv[1])
+    stats = cache.stats()
+    print(f"{stats['boards']} boards, {stats['bytes']} bytes "
+          f"({stats['bytes'] / max(stats['boards'], 1):.0f} bytes per board)")
+    cache.close()
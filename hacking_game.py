@@ -0,0 +1,1190 @@
+#!/usr/bin/env python3
+"""
+Game logic for the Fallout 4 hacking mini-game
+Board generation, the rules and the input handling, without curses, so the
+headless modes (simulation, replay, the solver) can use them without a
+terminal. The curses front end is hacking_ui; fallout_hacking is the CLI.
+"""
+
+import os
+import random
+import re
+import bisect
+import struct
+import time
+from collections import deque
+from itertools import islice
+from typing import Dict, Iterable, List, Tuple, Optional, Set
+
+from hacking_words import word_index
+
+# Word lists for different lengths
+WORD_LISTS = {
+    4: [
+        'BOOT', 'CORE', 'DATA', 'DISK', 'FILE', 'HOST', 'KEYS', 'LINK', 'LOAD', 'LOCK',
+        'NODE', 'PATH', 'PORT', 'ROOT', 'SAVE', 'SYNC', 'TASK', 'TERM', 'TIME', 'USER'
+    ],
+
+    5: [
+        'ADMIN', 'ALERT', 'ARRAY', 'CACHE', 'CHAIR', 'CLOCK', 'DEBUG', 'DESKS', 'DRIVE',
+        'ERROR', 'FILES', 'INPUT', 'LOGIN', 'LOGIC', 'LOGOUT', 'MOUSE', 'POWER', 'PRINT',
+        'RESET', 'SCREEN', 'START', 'TABLE', 'TIMER', 'TOKEN', 'TOOLS'
+    ],
+
+    6: [
+        'ACCESS', 'BACKUP', 'BINARY', 'BUTTON', 'CLIENT', 'CONFIG', 'CURSOR', 'DEVICE',
+        'EDITOR', 'EXPORT', 'FILTER', 'FOLDER', 'FORMAT', 'IMPORT', 'MEMORY', 'MODULE',
+        'OUTPUT', 'PYTHON', 'SCRIPT', 'SERVER', 'STATUS', 'SWITCH', 'SYNTAX', 'SYSTEM'
+    ],
+
+    7: [
+        'ADDRESS', 'ARCHIVE', 'BATTERY', 'COMMAND', 'COMPILE', 'CONSOLE', 'CONTROL',
+        'DEFAULT', 'DISPLAY', 'EXECUTE', 'FIRMWARE', 'FUNCTION', 'HARDWARE', 'KEYBOARD',
+        'MONITOR', 'NETWORK', 'PROCESS', 'PROGRAM', 'PROTOCOL', 'RESOURCE'
+    ],
+
+    8: [
+        'ACTIVATE', 'ADAPTERS', 'ARGUMENT', 'DATABASE', 'DOWNLOAD', 'EMULATOR',
+        'ENCRYPTS', 'FIREWALL', 'FRAMEWORK', 'INTERFACE', 'KEYSTROK', 'NOTEBOOK',
+        'OPERATOR', 'PIPELINE', 'PLATFORM', 'RENDERER', 'SCHEDULR', 'TERMINAL'
+    ],
+
+    9: [
+        'ALGORITHM', 'AUTHORITY', 'AUTOMATED', 'BANDWIDTH', 'BOOTSTRAP',
+        'COMPRESSION', 'CONFIGURE', 'CONTROLLER', 'DECRYPTED', 'DEPENDENT',
+        'FRAMEWORK', 'HYPERVIS', 'INITIALIZ', 'PERMISSION', 'PROCESSOR'
+    ],
+
+    10: [
+        'APPLICATION', 'AUTHENTIC', 'BACKUPFILE', 'CONFIGURED', 'CONNECTION',
+        'CONTROLLER', 'DEBUGGERX', 'DEVELOPERS', 'DOWNLOADED', 'ENVIRONMENT',
+        'MAINTENANC', 'MULTITHRE', 'OPERATIONS', 'PERMISSIONS', 'VALIDATION'
+    ],
+
+    11: [
+        'ACCELERATOR', 'AUTHENTICAT', 'CONFIGURATION', 'CONTINUATION',
+        'DECOMPRESSION', 'IMPLEMENTER', 'INITIALIZATION',
+        'INTERPRETERS', 'MAINTAINERS', 'MULTIPLEXING'
+    ],
+
+  12: [
+        'AUTHENTICATE',   # 12
+        'CONFIGURABLE',   # 12
+        'CONSTRUCTORS',   # 12
+        'DEVELOPMENT',    # 12
+        'ENCAPSULATE',    # 12
+        'INITIALIZERS',   # 12
+        'MULTITHREAD',    # 12
+        'ORCHESTRATE',    # 12
+        'PERFORMANCE',    # 12
+        'REFACTORING',    # 12
+        'SERIALIZERS',    # 12
+        'TRANSACTIONS'   # 12
+    ],
+
+    13: [
+        'AUTHORIZATION',  # 13
+        'DETERMINISTIC',  # 13
+        'IMPLEMENTATION',# 13
+        'INITIALIZATION',# 13
+        'INSTRUMENTATION',#13
+        'MULTITHREADED', # 13
+        'OPTIMIZATION',  # 13
+        'CONFIGURATION', # 13
+        'VIRTUALIZATION',# 13
+        'AUTHENTICATED', # 13
+        'ENCAPSULATION', # 13
+        'SERIALIZATION'  # 13
+    ],
+
+    14: [
+        'AUTHENTICATION', # 14
+        'CHARACTERISTIC', # 14
+        'CONFIGURATIONS', # 14
+        'DECOMPRESSION', # 14
+        'IMPLEMENTATIONS',#14
+        'INITIALIZATIONS',#14
+        'MULTIPROCESSING',#14
+        'VIRTUALMACHINE', # 14
+        'AUTHORIZATIONS', # 14
+        'PARALLELIZATION',#14
+        'SERIALIZATIONS', # 14
+        'TRANSMISSIONS'   # 14
+    ],
+
+    15: [
+        'AUTHENTICATIONS', # 15
+        'CHARACTERISTICS', # 15
+        'CONFIGURABILITY', # 15
+        'IMPLEMENTATIONAL',# 15
+        'MULTIPROCESSORS', # 15
+        'INITIALIZATIONSS',# 15 (intentionally double-S, Fallout-style)
+        'PARALLELPROCESS', # 15
+        'VIRTUALMACHINES', # 15
+        'AUTHORIZINGKEY',  # 15
+        'SERIALIZINGDATA', # 15
+        'TRANSACTIONLOG',  # 15
+        'ENCRYPTIONBLOCK'  # 15
+    ]
+}
+
+
+# Special characters for bracket sequences
+BRACKET_CHARS = '!@#$%^&*()_+-=[]{}|;:,.<>?/~`'
+HEX_CHARS = '0123456789ABCDEF'
+
+# 'likeness' is the target spread of dud likeness (letters in the right place,
+# as count_matches scores them) against the password: likeness -> share of
+# duds, with the highest key also covering every likeness above it.
+DIFFICULTY_CONFIG = {
+    1: {'name': 'VERY EASY', 'min_len': 4, 'max_len': 5, 'word_count': 8, 'attempts': 5, 'retry': True,
+        'likeness': {0: 0.15, 1: 0.35, 2: 0.35, 3: 0.15}},
+    2: {'name': 'EASY', 'min_len': 6, 'max_len': 8, 'word_count': 10, 'attempts': 5, 'retry': False,
+        'likeness': {0: 0.1, 1: 0.3, 2: 0.3, 3: 0.2, 4: 0.1}},
+    3: {'name': 'AVERAGE', 'min_len': 9, 'max_len': 10, 'word_count': 12, 'attempts': 5, 'retry': False,
+        'likeness': {0: 0.1, 1: 0.25, 2: 0.3, 3: 0.2, 4: 0.15}},
+    4: {'name': 'HARD', 'min_len': 11, 'max_len': 12, 'word_count': 14, 'attempts': 5, 'retry': False,
+        'likeness': {0: 0.05, 1: 0.2, 2: 0.3, 3: 0.25, 4: 0.2}},
+    5: {'name': 'VERY HARD', 'min_len': 13, 'max_len': 15, 'word_count': 16, 'attempts': 5, 'retry': False,
+        'likeness': {0: 0.05, 1: 0.15, 2: 0.3, 3: 0.3, 4: 0.2}}
+}
+
+
+class GridLine:
+    """One line of the hacking grid.
+
+    Slotted and backed by a bytearray so large numbers of games stay small in
+    memory; dud removal and bracket use edit the cells in place. ``address``
+    and ``content`` are still exposed as plain strings.
+
+    The bracket sequences on the line are found by scan_brackets on first use
+    and cached until the cells change.
+    """
+    __slots__ = ('_address', '_cells', 'word', 'word_start', 'bracket_info',
+                 'is_dud', 'removed', '_brackets')
+
+    def __init__(self, address, content: str, word: Optional[str] = None, 
+                 word_start: int = -1, bracket_info: Optional[Tuple[int, int, str]] = None,
+                 is_dud: bool = False, removed: bool = False, bracket_used: bool = False):
+        # bracket_used is accepted for compatibility and ignored: it follows from the cells now
+        self.address = address  # Hex address like "0xFA8C" (or its integer value)
+        self.content = content  # Full content string
+        self.word = word  # Word embedded in content (if any)
+        self.word_start = word_start  # Starting position of word in content
+        self.bracket_info = bracket_info  # (start, end, bracket_pair) placed by the generator, if any
+        self.is_dud = is_dud  # True if this is a dud word
+        self.removed = removed  # True if this dud has been removed
+
+    @property
+    def address(self) -> str:
+        return '0x%04X' % self._address
+
+    @address.setter
+    def address(self, value):
+        self._address = int(value, 16) if isinstance(value, str) else value
+
+    @property
+    def content(self) -> str:
+        return self._cells.decode('latin-1')
+
+    @content.setter
+    def content(self, value: str):
+        self._cells = bytearray(value.encode('latin-1'))
+        self._brackets = None
+
+    def set_cell(self, pos: int, char: str):
+        """Overwrite a single character in place"""
+        self._cells[pos] = ord(char)
+        self._brackets = None
+
+    def blank(self, start: int, end: int, char: str = '.'):
+        """Overwrite content[start:end] with char in place"""
+        self._cells[start:end] = char.encode('latin-1') * (end - start)
+        self._brackets = None
+
+    def brackets(self) -> Dict[int, Tuple[int, int, str]]:
+        """Usable bracket sequences on this line: {open position: (start, end, bracket_pair)}"""
+        if self._brackets is None:
+            self._brackets = scan_brackets(self._cells)
+        return self._brackets
+
+    @property
+    def bracket_used(self) -> bool:
+        """Read-only view kept for compatibility: True once the generator's bracket pair is gone"""
+        return self.bracket_info is not None and self.bracket_info[0] not in self.brackets()
+
+    @classmethod
+    def from_cells(cls, address: int, cells: bytes) -> 'GridLine':
+        """Plain line (no word or brackets placed yet) straight from its latin-1 cells"""
+        line = cls.__new__(cls)
+        line._address = address
+        line._cells = bytearray(cells)
+        line.word = None
+        line.word_start = -1
+        line.bracket_info = None
+        line.is_dud = False
+        line.removed = False
+        line._brackets = None
+        return line
+
+    def copy(self) -> 'GridLine':
+        """Copy with its own cells; the bracket cache is shared, edits replace it rather than change it"""
+        line = GridLine.__new__(GridLine)
+        line._address = self._address
+        line._cells = bytearray(self._cells)
+        line.word = self.word
+        line.word_start = self.word_start
+        line.bracket_info = self.bracket_info
+        line.is_dud = self.is_dud
+        line.removed = self.removed
+        line._brackets = self._brackets
+        return line
+
+
+# Characters used to fill grid lines
+FILLER_CHARS = '!@#$%^&*_-+|;:,.?/~`'  # Characters that aren't brackets
+SAFE_CHARS = ':;\'",.!=$*^\\|][)(}{><'  # Safe characters that won't interfere with highlighting
+BRACKET_PAIRS = ['()', '[]', '{}', '<>']
+
+_OPENERS = {ord(pair[0]): pair for pair in BRACKET_PAIRS}
+_CLOSERS = {ord(pair[1]): ord(pair[0]) for pair in BRACKET_PAIRS}
+# An opener followed by its closer with no letter in between: the leftmost complete sequence
+_ANY_SEQUENCE = re.compile('|'.join(re.escape(pair[0]) + '[^A-Z' + re.escape(pair[1]) + ']*' + re.escape(pair[1])
+                                    for pair in BRACKET_PAIRS).encode('ascii'))
+
+
+def scan_brackets(cells) -> Dict[int, Tuple[int, int, str]]:
+    """Find every bracket sequence on a line, as the original game does.
+
+    Each opening bracket pairs with the first closing bracket of its kind
+    to its right, as long as no letter sits between them; several openers
+    can share one closer. One pass keeps a stack of open positions per
+    bracket kind, and a letter empties them all.
+    """
+    first = _ANY_SEQUENCE.search(cells)
+    if first is None:
+        return {}  # Most lines have no sequence at all; openers before the first one can't pair either
+    found = {}
+    pending = {}  # opener byte -> open positions not closed yet
+    start = first.start()
+    for pos, c in enumerate(cells[start:], start):
+        if c in _OPENERS:
+            pending.setdefault(c, []).append(pos)
+        elif c in _CLOSERS:
+            opens = pending.pop(_CLOSERS[c], None)
+            if opens:
+                pair = _OPENERS[_CLOSERS[c]]
+                for start in opens:
+                    found[start] = (start, pos, pair)
+        elif 65 <= c <= 90 and pending:  # A-Z
+            pending.clear()
+    return found
+
+
+def new_seed() -> int:
+    """Fresh 64-bit seed from the OS, without touching the global random state"""
+    return int.from_bytes(os.urandom(8), 'big')
+
+
+class Geometry:
+    """Grid layout: rows per screen column, screen columns and characters per line.
+
+    Grid lines fill the screen left to right, then top to bottom, so line i
+    is at screen row i // num_columns, screen column i % num_columns.
+    """
+    __slots__ = ('num_rows', 'num_columns', 'content_length')
+
+    def __init__(self, num_rows: int = 17, num_columns: int = 2, content_length: int = 16):
+        if num_rows < 1 or num_columns < 1:
+            raise ValueError("a grid needs at least one row and one column")
+        if content_length < 6:
+            raise ValueError("grid lines need at least 6 characters for bracket sequences")
+        self.num_rows = num_rows
+        self.num_columns = num_columns
+        self.content_length = content_length
+
+    @classmethod
+    def parse(cls, text: str) -> 'Geometry':
+        """Geometry from 'ROWSxCOLUMNSxWIDTH', e.g. '17x2x16'"""
+        try:
+            num_rows, num_columns, content_length = (int(part) for part in text.lower().split('x'))
+        except ValueError:
+            raise ValueError(f"expected ROWSxCOLUMNSxWIDTH, got '{text}'")
+        return cls(num_rows, num_columns, content_length)
+
+    @property
+    def num_lines(self) -> int:
+        return self.num_rows * self.num_columns
+
+    def check(self, difficulty: int):
+        """Raise ValueError unless a board of this difficulty fits"""
+        config = DIFFICULTY_CONFIG[difficulty]
+        if self.num_lines < config['word_count'] or self.content_length < config['max_len']:
+            raise ValueError(f"{self} is too small for {config['word_count']} words "
+                             f"of up to {config['max_len']} letters")
+
+    def _key(self) -> Tuple[int, int, int]:
+        return (self.num_rows, self.num_columns, self.content_length)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Geometry) and self._key() == other._key()
+
+    def __hash__(self) -> int:
+        return hash(self._key())
+
+    def __repr__(self) -> str:
+        return 'Geometry(%d, %d, %d)' % self._key()
+
+
+DEFAULT_GEOMETRY = Geometry()
+
+
+class Board:
+    """A generated puzzle: candidate words, password and grid lines, ready for HackingGame"""
+    __slots__ = ('difficulty', 'words', 'password', 'grid_lines', 'seed', 'geometry')
+
+    def __init__(self, difficulty: int, words: List[str], password: str, grid_lines: List[GridLine],
+                 seed: Optional[int] = None, geometry: Optional[Geometry] = None):
+        self.difficulty = difficulty
+        self.words = words
+        self.password = password
+        self.grid_lines = grid_lines
+        self.seed = seed  # Seed the board was generated from, if any
+        self.geometry = geometry or DEFAULT_GEOMETRY
+
+
+def _likeness_quotas(target: dict, num_duds: int) -> List[Tuple[int, int]]:
+    """Split num_duds over the likeness buckets by largest remainder"""
+    total = sum(target.values())
+    shares = [(likeness, num_duds * weight / total) for likeness, weight in sorted(target.items())]
+    quotas = {likeness: int(share) for likeness, share in shares}
+    leftover = num_duds - sum(quotas.values())
+    for likeness, share in sorted(shares, key=lambda item: int(item[1]) - item[1])[:leftover]:
+        quotas[likeness] += 1
+    return sorted(quotas.items())
+
+
+SPREAD_DRAWS = 64  # Random words drawn per dud before _select_spread_duds falls back to the postings
+
+
+def _likeness_group(index, scores: dict, password: str, config: dict, likeness: int) -> List[Tuple[int, int]]:
+    """(length, word number) ids of every word in one likeness bucket, given the postings' scores.
+
+    The top bucket also takes the likenesses above it; the password and its
+    prefix-supersets score full likeness and are left out.
+    """
+    if likeness == 0:
+        return [(length, i) for length in range(config['min_len'], config['max_len'] + 1)
+                for i in range(index.count(length)) if i not in scores.get(length, ())]
+    high = len(password) if likeness == max(config['likeness']) else likeness + 1
+    return [(length, i) for length, counts in scores.items()
+            for i, score in counts.items() if likeness <= score < high]
+
+
+def _select_spread_duds(index, password: str, config: dict, num_duds: int,
+                        rng: random.Random) -> List[str]:
+    """Duds whose likeness against the password follows config['likeness'].
+
+    Random words are drawn and sorted into likeness buckets until every
+    bucket has its quota, a few draws per dud whatever the dictionary's
+    size. Buckets too rare for that, and small dictionaries, are filled from
+    the likeness postings, decoding only the words picked. Words starting
+    with the whole password are never picked: count_matches stops at the
+    shorter word, so they would score full likeness and open the terminal.
+    """
+    min_len = config['min_len']
+    max_len = config['max_len']
+    full = len(password)
+    top = max(config['likeness'])
+    quotas = dict(_likeness_quotas(config['likeness'], num_duds))
+    spans = [(length, index.count(length)) for length in range(min_len, max_len + 1) if index.count(length)]
+    total = sum(n for _, n in spans)
+    
+    picked = {likeness: {} for likeness in quotas}  # likeness -> {(length, word number): word}
+    short = {likeness for likeness, quota in quotas.items() if quota}
+    draws = SPREAD_DRAWS * num_duds
+    for _ in range(draws if total > draws else 0):
+        if not short:
+            break
+        i = rng.randrange(total)
+        for length, n in spans:
+            if i < n:
+                break
+            i -= n
+        word = index.word(length, i)
+        score = sum(a == b for a, b in zip(word, password))
+        likeness = min(score, top)
+        if score < full and likeness in short:
+            bucket = picked[likeness]
+            bucket[(length, i)] = word
+            if len(bucket) == quotas[likeness]:
+                short.discard(likeness)
+    
+    scores = index.likeness_index().likeness(password, min_len, max_len) if short else None
+    for likeness in sorted(short):
+        bucket = picked[likeness]
+        pool = [word_id for word_id in _likeness_group(index, scores, password, config, likeness)
+                if word_id not in bucket]
+        for word_id in rng.sample(pool, min(quotas[likeness] - len(bucket), len(pool))):
+            bucket[word_id] = index.word(*word_id)
+    chosen = {word_id: word for bucket in picked.values() for word_id, word in bucket.items()}
+    
+    # Buckets the dictionary couldn't fill are topped up with the most alike
+    # words left over, then with any other words
+    if len(chosen) < num_duds:
+        if scores is None:
+            scores = index.likeness_index().likeness(password, min_len, max_len)
+        for likeness in range(top, 0, -1):
+            spare = [word_id for word_id in _likeness_group(index, scores, password, config, likeness)
+                     if word_id not in chosen]
+            for word_id in rng.sample(spare, min(num_duds - len(chosen), len(spare))):
+                chosen[word_id] = index.word(*word_id)
+            if len(chosen) >= num_duds:
+                break
+    words = list(chosen.values())
+    if len(words) < num_duds:
+        taken = set(words)
+        spare = [w for w in index.sample(min_len, max_len, num_duds * 2 + 1, rng)
+                 if w not in taken and w != password and not w.startswith(password)]
+        words.extend(spare[:num_duds - len(words)])
+    return words
+
+
+def _gibberish(min_len: int, max_len: int, rng: random.Random) -> str:
+    return ''.join(rng.choices('ABCDEFGHIJKLMNOPQRSTUVWXYZ', k=rng.randint(min_len, max_len)))
+
+
+def select_words(config: dict, word_lists, rng: random.Random) -> Tuple[List[str], str]:
+    """Pick the board's words and password from a {length: [words]} dict or a WordIndex.
+
+    With a 'likeness' target in config the password is drawn first and the
+    duds are chosen to spread their likeness against it; otherwise all words
+    are sampled uniformly.
+    """
+    word_count = config['word_count']
+    min_len = config['min_len']
+    max_len = config['max_len']
+    index = word_index(word_lists)
+    
+    password = None
+    if config.get('likeness'):
+        words = index.sample(min_len, max_len, 1, rng)
+        if words:
+            password = words[0]
+            words += _select_spread_duds(index, password, config, word_count - 1, rng)
+    else:
+        words = index.sample(min_len, max_len, word_count, rng)
+    
+    # If still not enough words, add gibberish
+    while len(words) < word_count:
+        words.append(_gibberish(min_len, max_len, rng))
+    
+    rng.shuffle(words)
+    if password is None:
+        password = rng.choice(words)
+    
+    # A dud starting with the whole password would score full likeness and
+    # open the terminal, so no board may have one
+    for i, word in enumerate(words):
+        while word != password and word.startswith(password):
+            word = words[i] = _gibberish(min_len, max_len, rng)
+    return words, password
+
+
+def bracket_pair_count(difficulty: int, num_words: int) -> int:
+    """Number of word lines that also carry a bracket sequence"""
+    num_duds = num_words - 1  # All words except password are duds
+    bracket_counts = {
+        1: num_duds + 1,  # One bracket pair for each dud + one reset
+        2: num_duds - 1 + 1,  # One bracket pair less than duds + one reset
+        3: num_duds - 1 + 1,  # One bracket pair less than duds + one reset
+        4: num_duds - 2 + 1,  # Two bracket pairs less than duds + one reset
+        5: num_duds - 3 + 1   # Three bracket pairs less than duds + one reset
+    }
+    return max(1, bracket_counts.get(difficulty, 2))
+
+
+_bracket_slots_cache = {}
+
+
+def _bracket_slots(word_start: int, word_len: int, content_length: int) -> List[Tuple[int, int]]:
+    """All (bracket_start, bracket_end) pairs that don't overlap the word, cached per layout"""
+    key = (word_start, word_len, content_length)
+    slots = _bracket_slots_cache.get(key)
+    if slots is None:
+        word_end = word_start + word_len
+        slots = [(start, start + gap)
+                 for start in range(content_length - 5)
+                 for gap in range(1, 5)  # Ensure bracket_end > bracket_start
+                 if not (start < word_end and start + gap >= word_start)]
+        _bracket_slots_cache[key] = slots
+    return slots
+
+
+def _place_brackets(word_start: int, word_len: int, content_length: int,
+                    lane: int, gap_lane: int) -> Tuple[int, int]:
+    """Pick bracket positions uniformly among those that don't overlap the word, from two random lanes"""
+    slots = _bracket_slots(word_start, word_len, content_length)
+    if slots:
+        return slots[lane % len(slots)]
+    # The word leaves no room, just place brackets (word characters win)
+    bracket_start = lane % (content_length - 5)
+    return bracket_start, bracket_start + 1 + gap_lane % 4
+
+
+_FILLER_LIMIT = 256 - 256 % len(FILLER_CHARS)  # Random bytes from here up are dropped, keeping the draw unbiased
+_FILLER_TABLE = bytes(ord(FILLER_CHARS[b % len(FILLER_CHARS)]) for b in range(256))
+_FILLER_REJECTS = bytes(range(_FILLER_LIMIT, 256))
+PLACEMENT_LANES = 5  # 32-bit random lanes per word: start, safe character, bracket pair, slot, gap
+
+
+def draw_filler(rng: random.Random, count: int) -> bytes:
+    """count uniformly drawn FILLER_CHARS from one getrandbits call (rarely two)"""
+    filler = b''
+    while len(filler) < count:
+        need = count - len(filler)
+        size = need + need // 16 + 8  # A few spare bytes cover the rejected ones
+        filler += rng.getrandbits(8 * size).to_bytes(size, 'little').translate(_FILLER_TABLE, _FILLER_REJECTS)
+    return filler[:count]
+
+
+def build_grid(words: List[str], password: str, difficulty: int, filler: bytes,
+               address_bits: int, rng: random.Random,
+               geometry: Geometry = DEFAULT_GEOMETRY) -> List[GridLine]:
+    """Lay out a grid from pre-drawn randomness.
+
+    filler holds total_cells * content_length filler characters (see
+    draw_filler) and address_bits 16 random bits per line, so callers can
+    draw both in bulk; word and bracket placements come from one more bulk
+    draw on rng. Words go on random lines, each preceded by a safe
+    character; some word lines also get a bracket pair, with word
+    characters taking priority.
+    """
+    content_length = geometry.content_length
+    total_cells = geometry.num_lines
+    num_bracket_pairs = bracket_pair_count(difficulty, len(words))
+    
+    # Line i's address is bits 16*i..16*i+15, i.e. the i-th little-endian 16-bit word
+    addresses = struct.unpack('<%dH' % total_cells, address_bits.to_bytes(2 * total_cells, 'little'))
+    from_cells = GridLine.from_cells
+    lines = [from_cells(addresses[i], filler[i * content_length:(i + 1) * content_length])
+             for i in range(total_cells)]
+    
+    # Randomly select positions for words (spread across all rows)
+    word_positions = rng.sample(range(total_cells), len(words))
+    
+    # Decide which word positions will have bracket sequences
+    bracket_line_indices = set(rng.sample(word_positions, min(num_bracket_pairs, len(word_positions))))
+    
+    # Every other placement draw, as 32-bit lanes of one big random number;
+    # reducing a lane modulo a range this small has a bias below 1e-7
+    num_lanes = PLACEMENT_LANES * len(words)
+    lanes = struct.unpack('<%dI' % num_lanes, rng.getrandbits(32 * num_lanes).to_bytes(4 * num_lanes, 'little'))
+    
+    # Place words at selected positions
+    for w, (word, line_idx) in enumerate(zip(words, word_positions)):
+        line = lines[line_idx]
+        cells = line._cells
+        start_lane, safe_lane, pair_lane, slot_lane, gap_lane = lanes[w * PLACEMENT_LANES:(w + 1) * PLACEMENT_LANES]
+        word_start = start_lane % (max(0, content_length - len(word)) + 1)
+        if word_start > 0:
+            cells[word_start - 1] = ord(SAFE_CHARS[safe_lane % len(SAFE_CHARS)])
+        
+        if line_idx in bracket_line_indices:
+            bracket_pair = BRACKET_PAIRS[pair_lane % len(BRACKET_PAIRS)]
+            bracket_start, bracket_end = _place_brackets(word_start, len(word), content_length,
+                                                         slot_lane, gap_lane)
+            cells[bracket_start] = ord(bracket_pair[0])
+            cells[bracket_end] = ord(bracket_pair[1])
+            line.bracket_info = (bracket_start, bracket_end, bracket_pair)
+        
+        cells[word_start:word_start + len(word)] = word.encode('latin-1')
+        line.word = word
+        line.word_start = word_start
+        line.is_dud = word != password
+    
+    return lines
+
+
+# Bump whenever generate_board gives a different board for the same inputs,
+# so caches of generated boards (hacking_cache) stop serving the old ones
+GENERATOR_VERSION = 3
+
+
+def _generate(difficulty: int, config: dict, index, seed: int, geometry: Geometry) -> Board:
+    """One board from its own generator; the setup is the caller's"""
+    rng = random.Random(seed)
+    words, password = select_words(config, index, rng)
+    total_cells = geometry.num_lines
+    # Filler and addresses for the whole board in two bulk draws (placements are a third)
+    filler = draw_filler(rng, total_cells * geometry.content_length)
+    grid_lines = build_grid(words, password, difficulty, filler, rng.getrandbits(16 * total_cells), rng,
+                            geometry)
+    return Board(difficulty, words, password, grid_lines, seed, geometry)
+
+
+def generate_board(difficulty: int, word_lists: Optional[dict] = None,
+                   seed: Optional[int] = None, geometry: Optional[Geometry] = None) -> Board:
+    """Generate one board; the same seed and geometry always give the same board"""
+    if seed is None:
+        seed = new_seed()
+    geometry = geometry or DEFAULT_GEOMETRY
+    geometry.check(difficulty)
+    index = word_index(word_lists if word_lists is not None else WORD_LISTS)
+    return _generate(difficulty, DIFFICULTY_CONFIG[difficulty], index, seed, geometry)
+
+
+def generate_boards(n: int, difficulty: int, seed: Optional[int] = None,
+                    word_lists: Optional[dict] = None, geometry: Optional[Geometry] = None) -> List[Board]:
+    """Generate n boards, each with its own seed drawn from the master seed.
+
+    Board k is exactly generate_board(difficulty, word_lists, seed_k, geometry),
+    so any board can be rebuilt on its own from its seed. That rules out one
+    draw shared by the whole batch; instead the setup is done once and each
+    board's filler, addresses and placements are bulk draws on its own
+    generator.
+    """
+    geometry = geometry or DEFAULT_GEOMETRY
+    geometry.check(difficulty)
+    config = DIFFICULTY_CONFIG[difficulty]
+    index = word_index(word_lists if word_lists is not None else WORD_LISTS)
+    seeds = random.Random(seed)
+    return [_generate(difficulty, config, index, seeds.getrandbits(64), geometry) for _ in range(n)]
+
+
+# Key codes as curses reports them (the same values as curses.KEY_*), so
+# headless users of handle_key don't need to import curses
+KEY_DOWN, KEY_UP, KEY_LEFT, KEY_RIGHT = 258, 259, 260, 261
+KEY_ENTER = 343
+KEY_BTAB = 353
+
+_navigation_tables = {}  # Geometry -> {key: [target cell per cell]}
+
+
+def navigation_table(geometry: Geometry) -> Dict[int, List[int]]:
+    """Where each arrow key moves the cursor from every cell, built once per geometry.
+
+    Cells are numbered line_idx * content_length + col. Lines run left to
+    right across the columns, then down, so cell order is reading order.
+    """
+    table = _navigation_tables.get(geometry)
+    if table is not None:
+        return table
+    
+    num_rows = geometry.num_rows
+    num_columns = geometry.num_columns
+    content_length = geometry.content_length
+    num_lines = geometry.num_lines
+    up, down, left, right = [], [], [], []
+    for line_idx in range(num_lines):
+        current_row, current_col = divmod(line_idx, num_columns)
+        for col in range(content_length):
+            cell = line_idx * content_length + col
+            # Up and down stay within the screen column
+            up.append(cell - num_columns * content_length if current_row > 0 else cell)
+            below = line_idx + num_columns
+            down.append(cell + num_columns * content_length
+                        if current_row < num_rows - 1 and below < num_lines else cell)
+            
+            # Left and right walk along the screen row, then on to the previous/next row
+            if col > 0:
+                left.append(cell - 1)
+            elif current_col > 0:
+                left.append(cell - 1)  # Last character of the column to the left
+            elif current_row > 0:
+                left.append(cell - 1)  # Last character of the previous row
+            else:
+                left.append(cell)
+            if col < content_length - 1:
+                right.append(cell + 1)
+            elif current_col < num_columns - 1 and current_row < num_rows - 1 and line_idx + 1 < num_lines:
+                right.append(cell + 1)  # First character of the column to the right
+            elif current_col == num_columns - 1:
+                # First character of the next row, wrapping around at the bottom
+                next_line = ((current_row + 1) % num_rows) * num_columns
+                right.append(next_line * content_length if next_line < num_lines else cell)
+            else:
+                right.append(cell)
+    
+    table = {KEY_UP: up, KEY_DOWN: down, KEY_LEFT: left, KEY_RIGHT: right}
+    _navigation_tables[geometry] = table
+    return table
+
+
+# Event records kept by HackingGame(record_events=True): kind, value, line, arg
+EVENT = struct.Struct('<BBHH')
+EV_MOVE = 1     # Cursor moved: line = cursor_row, arg = cursor_col
+EV_GUESS = 2    # make_guess: line = the word's grid line, value = likeness
+EV_BRACKET = 3  # activate_bracket at line: value = BRACKET_* outcome, arg = removed dud line
+EV_LOCKOUT = 4  # Out of attempts
+BRACKET_NONE, BRACKET_DUD, BRACKET_RESET = 0, 1, 2
+NO_LINE = 0xFFFF
+
+
+class GameSnapshot:
+    """Saved state of a HackingGame, see HackingGame.snapshot.
+
+    The grid list and indexes are held by reference, not copied: the game
+    copies them before its next change instead (copy-on-write).
+    """
+
+    # Containers shared with the game until it next edits the grid
+    SHARED = ('grid_lines', 'removed_words', 'dud_lines', '_dud_positions', 'bracket_lines',
+              'word_cells', 'token_cells')
+    # Plain values
+    VALUES = ('attempts_left', 'cursor_row', 'cursor_col', 'game_over', 'won', 'locked_out',
+              'last_guess', 'last_match_count', 'replenish_bracket_used', 'guesses', 'brackets_used',
+              'duds_removed')
+    __slots__ = SHARED + VALUES + ('words', 'outputs', 'rng_state', 'events')
+
+    def __init__(self, game: 'HackingGame'):
+        for name in self.SHARED + self.VALUES:
+            setattr(self, name, getattr(game, name))
+        self.words = game.words
+        self.outputs = tuple(game.output_history)
+        self.rng_state = game._rng_state()
+        self.events = bytes(game.events) if game.events is not None else None
+
+
+class HackingGame:
+    """One round of the mini-game.
+
+    ``word_lists`` is a {length: [words]} dict or a hacking_words.WordIndex
+    (WORD_LISTS by default).
+
+    All randomness comes from per-instance generators derived from the seed:
+    the board from ``seed`` itself and in-game draws (bracket outcomes) from a
+    separate stream, so a game is reproduced exactly by passing the same seed.
+    ``rng``, if given, is only used to draw that seed.
+
+    With ``record_events`` every state change is appended to ``events`` as
+    EVENT records, which hacking_replay can save and play back.
+
+    ``output_history`` is a ring buffer of the last ``history_size`` messages
+    (one screen column's worth by default); ``output_version`` counts changes
+    to it, so renderers can tell whether it needs repainting.
+
+    ``snapshot``/``restore`` and ``fork`` branch a game for search and what-if
+    analysis. Branches share grid lines until they change them, so a branch
+    costs one copy of the line list and indexes plus one copy per line that
+    a bracket or dud removal actually edits.
+    """
+
+    def __init__(self, difficulty: int, record_history: bool = True,
+                 word_lists: Optional[dict] = None, board: Optional[Board] = None,
+                 seed: Optional[int] = None, rng: Optional[random.Random] = None,
+                 record_events: bool = False, geometry: Optional[Geometry] = None,
+                 history_size: Optional[int] = None):
+        self.difficulty = difficulty
+        self.record_history = record_history  # Headless runs skip the output column
+        self.word_lists = word_lists if word_lists is not None else WORD_LISTS
+        self.config = DIFFICULTY_CONFIG[difficulty]
+        self.attempts_left = self.config['attempts']
+        self.max_attempts = self.config['attempts']
+        if board is None:
+            if seed is None and rng is not None:
+                seed = rng.getrandbits(64)
+            board = generate_board(difficulty, self.word_lists, seed, geometry)
+        self.seed = board.seed
+        self.geometry = board.geometry
+        self.rng = random.Random(f'{self.seed}/play') if self.seed is not None else random.Random(new_seed())
+        # The game edits the board's grid lines in place, so a board is played once
+        self.words = board.words
+        self.password = board.password
+        self.grid_lines = board.grid_lines
+        self._build_indexes()
+        self.cursor_row = 0
+        self.cursor_col = 0
+        self.game_over = False
+        self.won = False
+        self.locked_out = False
+        self.last_guess = None
+        self.last_match_count = 0
+        self.dud_words = set()
+        self.output_history = deque(maxlen=history_size or self.geometry.num_rows)
+        self.output_version = 0
+        self.replenish_bracket_used = False
+        # Counters for telemetry
+        self.started_at = time.monotonic()
+        self.guesses = 0
+        self.brackets_used = 0
+        self.duds_removed = 0
+        self.dirty_lines = set()  # Grid line indices changed since the last frame
+        self.events = bytearray() if record_events else None
+        # Copy-on-write state: until the first snapshot the game edits its lines in place
+        self._shared = False  # Grid list and indexes are referenced by a snapshot
+        self._owned_lines = None  # Lines copied since then, or None for all of them
+        self._base_lines = None  # The grid list those copies were made from
+        self._saved_rng_state = None  # rng.getstate() until the next bracket draws from it
+
+    def _build_indexes(self):
+        """Index the grid so guesses and brackets don't have to scan every line"""
+        self.word_set = set(self.words)
+        self.word_lines = {}  # word -> grid line index
+        self.removed_words = set()
+        self.dud_lines = []  # Line indices of duds still on the board
+        self._dud_positions = {}  # line index -> position in dud_lines
+        self.bracket_lines = set()  # Line indices with at least one usable bracket sequence
+        # Selectable tokens for Tab / word jumps, as sorted cell numbers
+        self.line_length = line_length = self.geometry.content_length
+        self.navigation = navigation_table(self.geometry)
+        self.word_cells = []  # Start of every word still on the board
+        self.token_cells = []  # Word starts and bracket openers
+        # Lines come in cell order, so both token lists are built by appending
+        for i, line in enumerate(self.grid_lines):
+            base = i * line_length
+            brackets = line.brackets()
+            if brackets:
+                self.bracket_lines.add(i)
+            if line.word:
+                self.word_lines.setdefault(line.word, i)
+                if line.removed:
+                    self.removed_words.add(line.word)
+                else:
+                    if line.word != self.password:
+                        self._dud_positions[i] = len(self.dud_lines)
+                        self.dud_lines.append(i)
+                    word_cell = base + line.word_start
+                    self.word_cells.append(word_cell)
+                    self.token_cells.extend(sorted([word_cell] + [base + start for start in brackets]))
+                    continue
+            self.token_cells.extend(sorted(base + start for start in brackets))
+
+    def _line_tokens(self, line_idx: int) -> Tuple[List[int], List[int]]:
+        """Sorted (word starts, all token starts) on one line"""
+        line = self.grid_lines[line_idx]
+        base = line_idx * self.line_length
+        words = [base + line.word_start] if line.word and not line.removed else []
+        tokens = sorted(words + [base + start for start in line.brackets()])
+        return words, tokens
+
+    def _index_tokens(self, line_idx: int):
+        """Bring the token lists up to date for one line (only its own range is touched)"""
+        words, tokens = self._line_tokens(line_idx)
+        low = line_idx * self.line_length
+        high = low + self.line_length
+        for cells, new in ((self.word_cells, words), (self.token_cells, tokens)):
+            cells[bisect.bisect_left(cells, low):bisect.bisect_left(cells, high)] = new
+
+    def jump_target(self, step: int, words_only: bool = False,
+                    cell: Optional[int] = None) -> Tuple[int, int]:
+        """(row, col) of the next (step 1) or previous (step -1) token, wrapping around.
+
+        Counts from the cursor, or from `cell` (row * line_length + col) if given.
+        """
+        if cell is None:
+            cell = self.cursor_row * self.line_length + self.cursor_col
+        cells = self.word_cells if words_only else self.token_cells
+        if not cells:
+            return divmod(cell, self.line_length)
+        if step > 0:
+            i = bisect.bisect_right(cells, cell)
+            target = cells[i] if i < len(cells) else cells[0]
+        else:
+            i = bisect.bisect_left(cells, cell)
+            target = cells[i - 1]  # cells[-1] wraps around to the last token
+        return divmod(target, self.line_length)
+
+    def snapshot(self) -> GameSnapshot:
+        """Save the current state; nothing is copied per grid line"""
+        self._shared = True
+        self._owned_lines = set()
+        self._base_lines = self.grid_lines
+        return GameSnapshot(self)
+
+    def _rng_state(self) -> tuple:
+        # Only brackets draw from the rng, so snapshots in between share one state
+        if self._saved_rng_state is None:
+            self._saved_rng_state = self.rng.getstate()
+        return self._saved_rng_state
+
+    def restore(self, snapshot: GameSnapshot):
+        """Go back to a snapshot of this game, or of the game it was forked from.
+
+        A snapshot stays valid after restoring it, so it can be restored any
+        number of times.
+        """
+        if snapshot.words is not self.words:
+            raise ValueError("snapshot was taken from a different board")
+        current = self.grid_lines
+        if current is not snapshot.grid_lines:
+            if snapshot.grid_lines is self._base_lines:
+                changed = self._owned_lines  # Only the lines copied since this snapshot differ
+            else:
+                changed = [i for i, (old, new) in enumerate(zip(current, snapshot.grid_lines)) if old is not new]
+            self.dirty_lines.update(changed)
+        for name in GameSnapshot.SHARED + GameSnapshot.VALUES:
+            setattr(self, name, getattr(snapshot, name))
+        self._shared = True
+        self._owned_lines = set()
+        self._base_lines = self.grid_lines
+        if snapshot.rng_state is not self._saved_rng_state:
+            self.rng.setstate(snapshot.rng_state)
+            self._saved_rng_state = snapshot.rng_state
+        self.output_history = deque(snapshot.outputs, maxlen=self.output_history.maxlen)
+        self.output_version += 1  # Never goes back, or a renderer could miss the change
+        if snapshot.events is not None:
+            self.events = bytearray(snapshot.events)
+
+    def fork(self, snapshot: Optional[GameSnapshot] = None) -> 'HackingGame':
+        """Independent copy of the game that shares unchanged grid lines with this one.
+
+        The copy starts from snapshot, one of this game's, if given (forking a
+        game many times from one saved state skips taking a snapshot each
+        time), else from the game as it is now.
+        """
+        if snapshot is None:
+            snapshot = self.snapshot()
+        game = HackingGame.__new__(HackingGame)
+        game.__dict__.update(self.__dict__)
+        game.rng = random.Random.__new__(random.Random)  # Unseeded, restore sets its state
+        game._saved_rng_state = None
+        game.dirty_lines = set()
+        game.restore(snapshot)
+        return game
+
+    def _writable_line(self, line_idx: int) -> GridLine:
+        """Grid line about to be edited, copied first if a snapshot may still see it"""
+        if self._shared:
+            # First edit since a snapshot: take private copies of the containers
+            self.grid_lines = list(self.grid_lines)
+            self.removed_words = set(self.removed_words)
+            self.dud_lines = list(self.dud_lines)
+            self._dud_positions = dict(self._dud_positions)
+            self.bracket_lines = set(self.bracket_lines)
+            self.word_cells = list(self.word_cells)
+            self.token_cells = list(self.token_cells)
+            self._shared = False
+        owned = self._owned_lines
+        if owned is None or line_idx in owned:
+            return self.grid_lines[line_idx]
+        owned.add(line_idx)
+        line = self.grid_lines[line_idx] = self.grid_lines[line_idx].copy()
+        return line
+
+    def _event(self, kind: int, value: int = 0, line: int = 0, arg: int = 0):
+        if self.events is not None:
+            self.events += EVENT.pack(kind, value, line, arg)
+
+    def move_cursor(self, row: int, col: int):
+        """Put the cursor on grid line `row`, character `col`"""
+        if (row, col) != (self.cursor_row, self.cursor_col):
+            self.cursor_row = row
+            self.cursor_col = col
+            self._event(EV_MOVE, 0, row, col)
+
+    def get_current_highlight(self) -> Tuple[int, int]:
+        """Get the start and end positions of the current highlight"""
+        line = self.grid_lines[self.cursor_row]
+
+        # Check if cursor is on a word (removed duds are just dots)
+        if line.word and not line.removed and line.word_start <= self.cursor_col < line.word_start + len(line.word):
+            return (line.word_start, line.word_start + len(line.word))
+
+        # Check if cursor is on the opening bracket of a sequence
+        bracket = line.brackets().get(self.cursor_col)
+        if bracket:
+            return (bracket[0], bracket[1] + 1)
+
+        return (self.cursor_col, self.cursor_col + 1)
+
+    def get_current_word(self) -> Optional[str]:
+        """Get the word at current cursor position"""
+        line = self.grid_lines[self.cursor_row]
+        
+        if line.word and not line.removed and line.word_start <= self.cursor_col < line.word_start + len(line.word):
+            return line.word
+        
+        return None
+
+    def get_current_bracket(self) -> Optional[Tuple[int, int, str]]:
+        """Get the (start, end, bracket_pair) sequence opening at the cursor, if any"""
+        return self.grid_lines[self.cursor_row].brackets().get(self.cursor_col)
+
+    def count_matches(self, word: str) -> int:
+        return sum(1 for a, b in zip(word, self.password) if a == b)
+
+    def _log(self, *messages: str):
+        """Append messages to the output column"""
+        if not self.record_history:
+            return
+        self.output_history.extend(messages)  # The deque drops the oldest itself
+        self.output_version += 1
+
+    def recent_outputs(self, count: int) -> List[str]:
+        """The last `count` messages, oldest first"""
+        history = self.output_history
+        if len(history) <= count:
+            return list(history)
+        return list(islice(history, len(history) - count, None))
+
+    def make_guess(self, word: str) -> bool:
+        if self.game_over or self.locked_out:
+            return False
+        
+        # Check if word is a removed dud
+        if word in self.removed_words:
+            return False
+        
+        if word not in self.word_set:
+            return False
+        
+        matches = self.count_matches(word)
+        self.last_match_count = matches
+        self.attempts_left -= 1
+        self.guesses += 1
+        self._event(EV_GUESS, matches, self.word_lines[word])
+        
+        if matches == len(self.password):
+            self._log("ACCESS GRANTED")
+            self.won = True
+            self.game_over = True
+        else:
+            if self.record_history:
+                self._log(word, "Entry denied", f"{matches}/{len(self.password)} correct")
+            
+            if self.attempts_left <= 0 and not self.config['retry']:
+                self.locked_out = True
+                self.game_over = True
+                self._event(EV_LOCKOUT)
+        
+        return matches == len(self.password)
+
+    def _remove_dud(self, dud_idx: int):
+        """Replace a dud word with dots and drop it from the indexes"""
+        dud_line = self._writable_line(dud_idx)
+        word_len = len(dud_line.word)
+        
+        # Replace word with dots
+        dud_line.blank(dud_line.word_start, dud_line.word_start + word_len)
+        dud_line.removed = True
+        self.dirty_lines.add(dud_idx)
+        self.removed_words.add(dud_line.word)
+        if dud_line.brackets():
+            # Brackets on either side of the word can now pair up
+            self.bracket_lines.add(dud_idx)
+        self._index_tokens(dud_idx)
+        
+        # Swap-remove from dud_lines so rng.choice stays O(1)
+        pos = self._dud_positions.pop(dud_idx)
+        last = self.dud_lines.pop()
+        if last != dud_idx:
+            self.dud_lines[pos] = last
+            self._dud_positions[last] = pos
+
+    def activate_bracket(self) -> Tuple[bool, str]:
+        if self.game_over or self.locked_out:
+            return False, ""
+        
+        bracket_info = self.get_current_bracket()
+        if not bracket_info:
+            return False, ""
+        
+        # Use the sequence up by replacing its brackets with periods
+        line = self._writable_line(self.cursor_row)
+        self._saved_rng_state = None
+        bracket_start, bracket_end, bracket_pair = bracket_info
+        line.set_cell(bracket_start, '.')
+        line.set_cell(bracket_end, '.')
+        self.dirty_lines.add(self.cursor_row)
+        self.brackets_used += 1
+        if not line.brackets():
+            self.bracket_lines.discard(self.cursor_row)
+        self._index_tokens(self.cursor_row)
+        
+        # Decide action: remove dud or replenish
+        # Only ONE bracket should replenish per puzzle
+        if not self.replenish_bracket_used:
+            # 50% chance for first bracket, decreasing for others
+            if self.dud_lines and self.rng.random() < 0.5:
+                return self._bracket_removes_dud()
+            else:
+                # Replenish
+                self.replenish_bracket_used = True
+                self.attempts_left = self.max_attempts
+                self._log("Attempts reset.")
+                self._event(EV_BRACKET, BRACKET_RESET, self.cursor_row, NO_LINE)
+                return True, "Attempts reset"
+        else:
+            # Only remove duds after replenish used
+            if self.dud_lines:
+                return self._bracket_removes_dud()
+        
+        self._event(EV_BRACKET, BRACKET_NONE, self.cursor_row, NO_LINE)
+        return False, "No action available"
+
+    def _bracket_removes_dud(self) -> Tuple[bool, str]:
+        dud_idx = self.rng.choice(self.dud_lines)
+        self._remove_dud(dud_idx)
+        self.duds_removed += 1
+        self._log("Dud removed.")
+        self._event(EV_BRACKET, BRACKET_DUD, self.cursor_row, dud_idx)
+        return True, "Dud removed"
+
+
+# Keys that jump between selectable tokens: key -> (step, words only)
+JUMP_KEYS = {
+    9: (1, False),                   # Tab: next word or bracket
+    KEY_BTAB: (-1, False),           # Shift-Tab: previous word or bracket
+    ord('w'): (1, True),             # Next word
+    ord('b'): (-1, True),            # Previous word
+}
+
+
+def handle_key(game: HackingGame, key: int):
+    """Apply one key press (curses key code) to the game"""
+    # Navigation
+    moves = game.navigation.get(key)
+    if moves is not None:
+        row, col = divmod(moves[game.cursor_row * game.line_length + game.cursor_col], game.line_length)
+        game.move_cursor(row, col)
+    elif key in JUMP_KEYS:
+        step, words_only = JUMP_KEYS[key]
+        game.move_cursor(*game.jump_target(step, words_only))
+    
+    # Selection
+    elif key == KEY_ENTER or key in [10, 13]:
+        # Check if on a word
+        current_word = game.get_current_word()
+        if current_word:
+            game.make_guess(current_word)
+        else:
+            # Check if on a bracket
+            game.activate_bracket()
+
+
+def handle_keys(game: HackingGame, keys: Iterable[int]) -> int:
+    """Apply a batch of key presses in order; returns how many moves were coalesced.
+
+    Each run of cursor keys becomes one net move, so a backlog of key
+    repeats costs one cursor update (and one logged move) instead of one
+    per key. Guesses and brackets still happen where they were typed, and
+    keys after the game ends are dropped.
+    """
+    line_length = game.line_length
+    navigation = game.navigation
+    cell = None  # Where the pending run of moves has got to
+    coalesced = 0
+    for key in keys:
+        if game.game_over:
+            break
+        moves = navigation.get(key)
+        jump = JUMP_KEYS.get(key) if moves is None else None
+        if moves is not None or jump is not None:
+            if cell is None:
+                cell = game.cursor_row * line_length + game.cursor_col
+            else:
+                coalesced += 1
+            if moves is not None:
+                cell = moves[cell]
+            else:
+                row, col = game.jump_target(*jump, cell=cell)
+                cell = row * line_length + col
+            continue
+        if cell is not None:
+            game.move_cursor(*divmod(cell, line_length))
+            cell = None
+        handle_key(game, key)
+    if cell is not None:
+        game.move_cursor(*divmod(cell, line_length))
+    return coalesced
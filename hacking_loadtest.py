@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Load-test client for the hacking game server (fallout_hacking.py --serve PORT)
+Opens many concurrent sessions against a local server: most stay idle, the
+active ones press keys and time how long each frame takes to come back.
+"""
+
+import argparse
+import asyncio
+import time
+from typing import List
+
+UP = b'\x1b[A'
+DOWN = b'\x1b[B'
+FRAME_BYTES_PER_CELL = 32  # Generous bound on a full frame's bytes per grid character, escapes included
+
+
+class LoadStats:
+    def __init__(self):
+        self.connected = 0
+        self.failed = 0
+        self.keys = 0
+        self.timeouts = 0
+        self.bytes_received = 0
+        self.latencies = []  # Seconds from key sent to the end of its frame
+
+    def report(self, elapsed: float) -> str:
+        lat = sorted(self.latencies)
+
+        def pct(p: float) -> float:
+            return 1000.0 * lat[min(len(lat) - 1, int(p * len(lat)))] if lat else 0.0
+
+        return '\n'.join([
+            f"Sessions connected: {self.connected}, failed: {self.failed}",
+            f"Keys sent: {self.keys} in {elapsed:.2f}s ({self.keys / max(elapsed, 1e-9):.0f}/s), "
+            f"timeouts: {self.timeouts}",
+            f"Bytes received: {self.bytes_received}",
+            f"Key-to-frame latency ms: p50 {pct(0.50):.2f}  p90 {pct(0.90):.2f}  "
+            f"p99 {pct(0.99):.2f}  max {pct(1.0):.2f}",
+        ])
+
+
+async def _read_frame(reader: asyncio.StreamReader, stats: LoadStats, timeout: float, end: bytes) -> bool:
+    try:
+        data = await asyncio.wait_for(reader.readuntil(end), timeout)
+    except asyncio.TimeoutError:
+        stats.timeouts += 1
+        return False
+    except asyncio.IncompleteReadError:
+        return False
+    stats.bytes_received += len(data)
+    return True
+
+
+def frame_limit(geometry) -> int:
+    """Stream buffer limit that fits a full frame of this geometry, so readuntil() can find its end"""
+    return (1 << 16) + geometry.num_lines * geometry.content_length * FRAME_BYTES_PER_CELL
+
+
+async def session(host: str, port: int, keys: int, interval: float, hold: float,
+                  stats: LoadStats, timeout: float, end: bytes, limit: int):
+    """One client: connect, read the first frame, press keys, then hold the connection.
+
+    end is hacking_server.frame_end() for the server's geometry and limit
+    frame_limit() for it.
+    """
+    try:
+        reader, writer = await asyncio.open_connection(host, port, limit=limit)
+    except OSError:
+        stats.failed += 1
+        return
+    stats.connected += 1
+    try:
+        await _read_frame(reader, stats, timeout, end)
+        # DOWN/UP from the top row always changes the cursor line, so every key gets a frame back
+        for i in range(keys):
+            started = time.perf_counter()
+            writer.write(DOWN if i % 2 == 0 else UP)
+            await writer.drain()
+            if await _read_frame(reader, stats, timeout, end):
+                stats.latencies.append(time.perf_counter() - started)
+            stats.keys += 1
+            await asyncio.sleep(interval)
+        await asyncio.sleep(hold)
+        writer.write(b'q')
+        await writer.drain()
+    except (ConnectionError, asyncio.LimitOverrunError):
+        # A frame bigger than the limit leaves the stream unreadable, so the session fails
+        stats.failed += 1
+    finally:
+        writer.close()
+
+
+async def run(host: str, port: int, sessions: int, active: int, keys: int,
+              interval: float, hold: float, timeout: float, end: bytes, limit: int) -> LoadStats:
+    stats = LoadStats()
+    tasks: List[asyncio.Task] = []
+    for i in range(sessions):
+        n = keys if i < active else 0
+        tasks.append(asyncio.create_task(session(host, port, n, interval, hold, stats, timeout, end, limit)))
+    await asyncio.gather(*tasks)
+    return stats
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Load test for fallout_hacking.py --serve')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=2323)
+    parser.add_argument('--sessions', type=int, default=1000, help='Concurrent connections')
+    parser.add_argument('--active', type=int, default=100, help='How many of them press keys')
+    parser.add_argument('--keys', type=int, default=50, help='Keys per active session')
+    parser.add_argument('--interval', type=float, default=0.01, help='Seconds between keys')
+    parser.add_argument('--hold', type=float, default=1.0, help='Seconds to stay connected at the end')
+    parser.add_argument('--timeout', type=float, default=5.0, help='Seconds to wait for a frame')
+    parser.add_argument('--geometry', default='17x2x16',
+                        help="The server's --geometry (ROWSxCOLUMNSxWIDTH), which sets where frames end")
+    args = parser.parse_args()
+
+    from hacking_game import Geometry
+    from hacking_server import _raise_fd_limit, frame_end
+    try:
+        geometry = Geometry.parse(args.geometry)
+    except ValueError as e:
+        parser.error(f"--geometry: {e}")
+    _raise_fd_limit()
+
+    started = time.perf_counter()
+    result = asyncio.run(run(args.host, args.port, args.sessions, args.active, args.keys,
+                             args.interval, args.hold, args.timeout, frame_end(geometry),
+                             frame_limit(geometry)))
+    print(result.report(time.perf_counter() - started))
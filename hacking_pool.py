@@ -0,0 +1,117 @@
+"""
+Pool of pre-generated boards per difficulty tier
+Boards are generated ahead of time on a background thread, so creating a
+game (or the next one on retry) only pops a ready board off a queue.
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterable, Optional
+
+from hacking_game import DIFFICULTY_CONFIG, Board, Geometry, HackingGame, generate_board, generate_boards
+
+
+class PuzzlePool:
+    """Keeps up to `size` ready boards per difficulty and refills below `low_water`"""
+
+    def __init__(self, size: int = 8, low_water: Optional[int] = None,
+                 difficulties: Optional[Iterable[int]] = None,
+                 word_lists: Optional[dict] = None, seed: Optional[int] = None,
+                 geometry: Optional[Geometry] = None):
+        self.size = size
+        self.low_water = low_water if low_water is not None else max(1, size // 2)
+        self.difficulties = list(difficulties) if difficulties is not None else sorted(DIFFICULTY_CONFIG)
+        self.word_lists = word_lists
+        self.geometry = geometry
+        self.queues = {d: deque() for d in self.difficulties}  # deque append/popleft are thread-safe
+        self._seeds = random.Random(seed)  # Only used by the refill thread
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.refills = 0
+        self.boards_generated = 0
+        self.refill_seconds_total = 0.0
+        self.refill_seconds_max = 0.0
+        self.refill_seconds_last = 0.0
+
+    def start(self, prefill: bool = True) -> 'PuzzlePool':
+        """Start the refill thread; with prefill, fill every tier before returning"""
+        if prefill:
+            self._refill()
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='puzzle-pool', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def take(self, difficulty: int) -> Board:
+        """Pop a ready board, or generate one synchronously if the tier is empty"""
+        queue = self.queues.get(difficulty)
+        board = None
+        if queue:
+            try:
+                board = queue.popleft()
+            except IndexError:  # Emptied by another thread in between
+                pass
+        if board is None:
+            self.misses += 1
+            board = generate_board(difficulty, self.word_lists, geometry=self.geometry)
+        else:
+            self.hits += 1
+        if queue is not None and len(queue) < self.low_water:
+            self._wake.set()
+        return board
+
+    def new_game(self, difficulty: int, **kwargs) -> HackingGame:
+        """Create a HackingGame from a pooled board"""
+        return HackingGame(difficulty, word_lists=self.word_lists, board=self.take(difficulty), **kwargs)
+
+    def stats(self) -> Dict[str, float]:
+        refills = max(1, self.refills)
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'refills': self.refills,
+            'boards_generated': self.boards_generated,
+            'refill_ms_avg': 1000.0 * self.refill_seconds_total / refills,
+            'refill_ms_max': 1000.0 * self.refill_seconds_max,
+            'refill_ms_last': 1000.0 * self.refill_seconds_last,
+            'ready': {d: len(q) for d, q in self.queues.items()},
+        }
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait()
+            self._wake.clear()
+            if not self._stop.is_set():
+                self._refill()
+
+    def _refill(self):
+        """Top up every tier that is below low water back to full size"""
+        for difficulty, queue in self.queues.items():
+            missing = self.size - len(queue)
+            if len(queue) >= self.low_water or missing <= 0:
+                continue
+            started = time.perf_counter()
+            boards = generate_boards(missing, difficulty, self._seeds.getrandbits(64), self.word_lists,
+                                     self.geometry)
+            queue.extend(boards)
+            elapsed = time.perf_counter() - started
+            self.refills += 1
+            self.boards_generated += len(boards)
+            self.refill_seconds_total += elapsed
+            self.refill_seconds_last = elapsed
+            self.refill_seconds_max = max(self.refill_seconds_max, elapsed)
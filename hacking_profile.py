@@ -0,0 +1,209 @@
+"""
+Opt-in profiling for the hacking mini-game
+Enabled with --profile or the FALLOUT_HACKING_PROFILE environment variable.
+Timed wrappers are patched over the input, game-logic and drawing functions,
+so nothing changes in the code paths when profiling is off. Every call is
+recorded in a log-linear (HDR-style) latency histogram, plus a 'frame'
+histogram from a key press being handled to its frame being drawn and, at
+the terminal, 'input_to_paint' from a key being read to its frame going out
+(time spent waiting for the frame budget included). A summary
+is printed on exit and, if a path is given, a cProfile dump is written for
+pstats / snakeviz.
+"""
+
+import atexit
+import cProfile
+import functools
+import sys
+import time
+from typing import Dict, List, Optional
+
+PROFILE_ENV = 'FALLOUT_HACKING_PROFILE'  # '1' for histograms, or a path to also write cProfile stats
+
+SUB_BUCKET_BITS = 5  # 32 sub-buckets per power of two, so values are kept to within ~3%
+_SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+
+# What gets timed; names a module doesn't have are skipped
+INPUT_FUNCTIONS = ['handle_key', 'handle_keys']
+GAME_METHODS = ['make_guess', 'activate_bracket', 'move_cursor', 'get_current_highlight',
+                'get_current_word', 'get_current_bracket']
+DRAW_FUNCTIONS = ['draw_header', 'draw_grid', 'draw_grid_line', 'draw_final_screen']
+RENDERER_METHODS = ['render', 'flush']
+
+
+class LatencyHistogram:
+    """Nanosecond latencies in log-linear buckets: constant memory, bounded relative error"""
+
+    def __init__(self):
+        self.counts = []
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    @staticmethod
+    def bucket(value: int) -> int:
+        if value < _SUB_BUCKETS:
+            return value
+        shift = value.bit_length() - SUB_BUCKET_BITS - 1
+        return shift * _SUB_BUCKETS + (value >> shift)
+
+    @staticmethod
+    def bucket_value(bucket: int) -> int:
+        """Lowest value that falls into a bucket"""
+        if bucket < 2 * _SUB_BUCKETS:
+            return bucket
+        shift = bucket // _SUB_BUCKETS - 1
+        return (bucket - shift * _SUB_BUCKETS) << shift
+
+    def record(self, value: int):
+        b = self.bucket(value)
+        counts = self.counts
+        if b >= len(counts):
+            counts.extend([0] * (b + 1 - len(counts)))
+        counts[b] += 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: 'LatencyHistogram'):
+        if len(other.counts) > len(self.counts):
+            self.counts.extend([0] * (len(other.counts) - len(self.counts)))
+        for b, n in enumerate(other.counts):
+            self.counts[b] += n
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        self.max = max(self.max, other.max)
+
+    def to_dict(self) -> dict:
+        """State as JSON types (non-empty buckets only); from_dict restores it"""
+        return {'count': self.count, 'total': self.total, 'min': self.min, 'max': self.max,
+                'buckets': {str(b): n for b, n in enumerate(self.counts) if n}}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'LatencyHistogram':
+        hist = cls()
+        buckets = {int(b): n for b, n in data['buckets'].items()}
+        hist.counts = [buckets.get(b, 0) for b in range(max(buckets, default=-1) + 1)]
+        hist.count = data['count']
+        hist.total = data['total']
+        hist.min = data['min']
+        hist.max = data['max']
+        return hist
+
+    def percentile(self, p: float) -> int:
+        """Value at or below which a fraction p of the recordings fall"""
+        if not self.count:
+            return 0
+        rank = max(1, int(p * self.count + 0.5))
+        seen = 0
+        for b, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return min(self.bucket_value(b), self.max)
+        return self.max
+
+
+class Profiler:
+    """Histograms per instrumented function, plus an optional cProfile run"""
+
+    def __init__(self, pstats_path: Optional[str] = None):
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.pstats_path = pstats_path
+        self.cprofile = None
+        self._frame_started = None
+
+    def histogram(self, name: str) -> LatencyHistogram:
+        hist = self.histograms.get(name)
+        if hist is None:
+            hist = self.histograms[name] = LatencyHistogram()
+        return hist
+
+    def _timed(self, name: str, func, starts_frame: bool = False, ends_frame: bool = False):
+        hist = self.histogram(name)
+        frame = self.histogram('frame')
+        clock = time.perf_counter_ns
+
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            started = clock()
+            if starts_frame and self._frame_started is None:
+                self._frame_started = started
+            try:
+                return func(*args, **kwargs)
+            finally:
+                ended = clock()
+                hist.record(ended - started)
+                if ends_frame and self._frame_started is not None:
+                    frame.record(ended - self._frame_started)
+                    self._frame_started = None
+        return timed
+
+    def _patch(self, owner, attr: str, name: str, **frame):
+        func = getattr(owner, attr, None)
+        if func is None or getattr(func, '_profiled', False):
+            return  # Missing, or already wrapped through another module that shares it
+        timed = self._timed(name, func, **frame)
+        timed._profiled = True
+        setattr(owner, attr, timed)
+
+    def instrument(self, module):
+        """Patch timed wrappers over the hot functions of a module using the game.
+
+        Call it for every module that looks the functions up in its own
+        globals (hacking_ui, hacking_server), or hacking_game for headless games.
+        """
+        for name in INPUT_FUNCTIONS:
+            self._patch(module, name, f'input.{name}', starts_frame=True)
+        for name in DRAW_FUNCTIONS:
+            self._patch(module, name, f'draw.{name}')
+        game_class = getattr(module, 'HackingGame', None)
+        for name in GAME_METHODS if game_class is not None else []:
+            self._patch(game_class, name, f'game.{name}')
+        renderer_class = getattr(module, 'GridRenderer', None)
+        for name in RENDERER_METHODS if renderer_class is not None else []:
+            self._patch(renderer_class, name, f'draw.GridRenderer.{name}', ends_frame=name == 'render')
+        if hasattr(module, 'paint_latency'):
+            module.paint_latency = self.histogram('input_to_paint').record
+
+    def start(self) -> 'Profiler':
+        if self.pstats_path:
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+        atexit.register(self.finish)
+        return self
+
+    def finish(self):
+        if self.cprofile is not None:
+            self.cprofile.disable()
+            self.cprofile.dump_stats(self.pstats_path)
+            self.cprofile = None
+        print(self.summary(), file=sys.stderr)
+        if self.pstats_path:
+            print(f"cProfile stats written to {self.pstats_path} (python -m pstats {self.pstats_path})",
+                  file=sys.stderr)
+
+    def summary(self) -> str:
+        def us(ns: int) -> str:
+            return f"{ns / 1000.0:10.1f}"
+
+        rows: List[str] = [f"{'latency (us)':32} {'calls':>8} {'p50':>10} {'p90':>10} {'p99':>10} "
+                           f"{'max':>10} {'total ms':>10}"]
+        ranked = sorted(self.histograms.items(), key=lambda item: -item[1].total)
+        for name, hist in ranked:
+            if hist.count:
+                rows.append(f"{name:32} {hist.count:8} {us(hist.percentile(0.5))} {us(hist.percentile(0.9))} "
+                            f"{us(hist.percentile(0.99))} {us(hist.max)} {hist.total / 1e6:10.2f}")
+        return '\n'.join(rows)
+
+
+def enable(module, pstats_path: Optional[str] = None) -> Profiler:
+    """Instrument a module namespace (see Profiler.instrument) and start recording"""
+    profiler = Profiler(pstats_path)
+    profiler.instrument(module)
+    return profiler.start()
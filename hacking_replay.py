@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Session log and replayer for the hacking mini-game
+Games played with record_events=True are appended to a binary log, one game
+per record: its seed, difficulty and grid geometry, the generator version and
+the word list's digest, followed by the raw EVENT records. The seed rebuilds
+the board and the bracket draws, so replaying the events reproduces the
+game's state after any step, without curses. A record whose generator or
+word list differs from the replayer's would rebuild a different board, so
+it is refused rather than replayed.
+
+Log file layout (all integers little-endian):
+    8 bytes   magic b'FHLOG3\\0\\0'
+    then one record per game:
+    24 bytes  difficulty (u8), status (u8, STATUS_*), generator version, rows, columns,
+              line length, seed length (u16 each), word list digest (first 8 bytes of
+              WordIndex.digest()), event count (u32)
+    ...       seed as ASCII decimal
+    ...       events, EVENT.size bytes each (see hacking_game.EVENT)
+
+Older logs (magic b'FHLOG1\\0\\0' or b'FHLOG2\\0\\0') don't name the
+generator that built their boards, which has changed since, so they are
+refused rather than replayed against different boards.
+"""
+
+import re
+import struct
+import sys
+import time
+from collections import OrderedDict
+from typing import Iterator, Optional
+
+from hacking_game import (DEFAULT_GEOMETRY, EVENT, EV_BRACKET, EV_GUESS, EV_LOCKOUT, EV_MOVE, GENERATOR_VERSION,
+                          WORD_LISTS, BRACKET_DUD, BRACKET_NONE, BRACKET_RESET, Geometry, HackingGame)
+from hacking_words import word_index
+
+LOG_MAGIC = b'FHLOG3\0\0'
+OLD_LOG_MAGICS = (b'FHLOG1\0\0', b'FHLOG2\0\0')
+_RECORD = struct.Struct('<BBHHHHH8sI')
+DIGEST_SIZE = 8  # Bytes of the word list digest kept per record
+STATUS_UNFINISHED, STATUS_WON, STATUS_LOCKED_OUT = 0, 1, 2
+READ_BUFFER = 1 << 20
+MEMO_GAMES = 1024  # Fresh games a GameMemo keeps by default
+# Kind bytes of everything but cursor moves; runs of moves are skipped by the regex engine
+_ACTIONS = re.compile(b'[^' + re.escape(bytes([EV_MOVE])) + b']')
+
+
+class ReplayError(Exception):
+    """A logged event doesn't match what the replayed game did"""
+
+
+class GameRecord:
+    """One logged game: enough to rebuild it from scratch"""
+
+    __slots__ = ('difficulty', 'status', 'seed', 'events', 'geometry', 'generator_version', 'words_digest')
+
+    def __init__(self, difficulty: int, status: int, seed: int, events: bytes,
+                 geometry: Optional[Geometry] = None, generator_version: int = GENERATOR_VERSION,
+                 words_digest: Optional[bytes] = None):
+        self.difficulty = difficulty
+        self.status = status
+        self.seed = seed
+        self.events = events
+        self.geometry = geometry or DEFAULT_GEOMETRY
+        self.generator_version = generator_version
+        self.words_digest = words_digest or _words_digest(None)
+
+    @classmethod
+    def from_game(cls, game: HackingGame) -> 'GameRecord':
+        if game.events is None:
+            raise ValueError("game was not created with record_events=True")
+        if game.seed is None:
+            raise ValueError("game has no seed, so it can't be replayed")
+        status = STATUS_WON if game.won else STATUS_LOCKED_OUT if game.locked_out else STATUS_UNFINISHED
+        return cls(game.difficulty, status, game.seed, bytes(game.events), game.geometry,
+                   words_digest=_words_digest(game.word_lists))
+
+    def __len__(self) -> int:
+        return len(self.events) // EVENT.size
+
+    def pack(self) -> bytes:
+        seed = str(self.seed).encode('ascii')
+        geometry = self.geometry
+        return _RECORD.pack(self.difficulty, self.status, self.generator_version, geometry.num_rows,
+                            geometry.num_columns, geometry.content_length, len(seed), self.words_digest,
+                            len(self)) + seed + self.events
+
+
+def _words_digest(word_lists) -> bytes:
+    """What a record keeps of its word list's digest (WordIndex caches the full one)"""
+    return word_index(word_lists if word_lists is not None else WORD_LISTS).digest()[:DIGEST_SIZE]
+
+
+class EventLogWriter:
+    """Appends finished games to a log file; the file is only ever appended to"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.file = open(path, 'ab')
+        if self.file.tell() == 0:
+            self.file.write(LOG_MAGIC)
+            self.file.flush()
+        else:
+            with open(path, 'rb') as f:
+                magic = f.read(len(LOG_MAGIC))
+            if magic != LOG_MAGIC:
+                self.file.close()
+                what = "an old-format" if magic in OLD_LOG_MAGICS else "not a"
+                raise ValueError(f"{path} is {what} hacking event log, so games can't be appended to it")
+        self.games = 0
+
+    def write(self, game: HackingGame):
+        # One write per game, so a crash can only cut off the last record
+        self.file.write(GameRecord.from_game(game).pack())
+        self.file.flush()
+        self.games += 1
+
+    def close(self):
+        self.file.close()
+
+
+def read_log(path: str) -> Iterator[GameRecord]:
+    """Stream the games of a log file; memory use is one game at a time"""
+    with open(path, 'rb', buffering=READ_BUFFER) as f:
+        magic = f.read(len(LOG_MAGIC))
+        if magic in OLD_LOG_MAGICS:
+            raise ValueError(f"{path} was written by an older generator, so its games can't be replayed")
+        if magic != LOG_MAGIC:
+            raise ValueError(f"{path} is not a hacking event log")
+        geometry = DEFAULT_GEOMETRY
+        while True:
+            header = f.read(_RECORD.size)
+            if len(header) < _RECORD.size:
+                return  # End of file, or a record cut off by a crash
+            (difficulty, status, version, num_rows, num_columns, content_length, seed_len, digest,
+             count) = _RECORD.unpack(header)
+            if (num_rows, num_columns, content_length) != geometry._key():
+                geometry = Geometry(num_rows, num_columns, content_length)  # Shared by runs of games on one grid
+            seed = f.read(seed_len)
+            events = f.read(count * EVENT.size)
+            if len(seed) < seed_len or len(events) < count * EVENT.size:
+                return
+            yield GameRecord(difficulty, status, int(seed), events, geometry, version, digest)
+
+
+def _new_game(record: GameRecord, word_lists, history_size: Optional[int], board_cache) -> HackingGame:
+    """The logged game before its first event"""
+    geometry = record.geometry
+    board = None
+    if board_cache is not None:
+        board = board_cache.board(record.difficulty, record.seed, word_lists, geometry)
+    return HackingGame(record.difficulty, record_history=history_size is not None, word_lists=word_lists,
+                       board=board, seed=record.seed, history_size=history_size, geometry=geometry)
+
+
+class GameMemo:
+    """Fresh games for replay, each board generated and indexed once.
+
+    Logs of daily or shared puzzles hold many games on one seed. Every replay
+    of such a game forks a kept pristine copy, whose grid lines it shares
+    copy-on-write, instead of building the board again. The least recently
+    used games are dropped past max_games.
+    """
+
+    def __init__(self, max_games: int = MEMO_GAMES):
+        self.max_games = max_games
+        # (difficulty, seed, geometry, words digest, history size) -> (pristine game, its snapshot)
+        self.games = OrderedDict()
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+
+    def game(self, record: GameRecord, word_lists=None, history_size: Optional[int] = None,
+             board_cache=None) -> HackingGame:
+        key = (record.difficulty, record.seed, record.geometry, record.words_digest, history_size)
+        entry = self.games.get(key)
+        if entry is None:
+            self.misses += 1
+            game = _new_game(record, word_lists, history_size, board_cache)
+            entry = self.games[key] = (game, game.snapshot())
+            if len(self.games) > self.max_games:
+                self.games.popitem(last=False)
+        else:
+            self.hits += 1
+            self.games.move_to_end(key)
+        pristine, snapshot = entry
+        return pristine.fork(snapshot)
+
+    def stats(self) -> dict:
+        return {'games': len(self.games), 'hits': self.hits, 'misses': self.misses}
+
+
+def replay(record: GameRecord, word_lists=None, steps: Optional[int] = None,
+           check: bool = True, history_size: Optional[int] = None, board_cache=None,
+           memo: Optional[GameMemo] = None) -> HackingGame:
+    """Rebuild a logged game after its first `steps` events (all by default).
+
+    The board comes from the seed and the record's geometry, so word_lists
+    must be the dictionary the game was played with. With check, every
+    guess and bracket outcome is compared against the log and a mismatch
+    raises ReplayError. The output messages are only rebuilt when
+    history_size is given, keeping that many. A GameMemo reuses games
+    already built for the same seed, and a hacking_cache.BoardCache loads
+    boards seen before instead of generating them again. A record from
+    another generator version or word list raises ReplayError, since its
+    seed would build a different board.
+    """
+    if record.generator_version != GENERATOR_VERSION:
+        raise ReplayError(f"game with seed {record.seed} was logged by generator version "
+                          f"{record.generator_version}, this is version {GENERATOR_VERSION}")
+    if record.words_digest != _words_digest(word_lists):
+        raise ReplayError(f"game with seed {record.seed} was played with a different word list")
+    if memo is not None:
+        game = memo.game(record, word_lists, history_size, board_cache)
+    else:
+        game = _new_game(record, word_lists, history_size, board_cache)
+    events = memoryview(record.events)
+    if steps is not None:
+        events = events[:steps * EVENT.size]
+
+    kinds = bytes(events[::EVENT.size])
+    move = bytes([EV_MOVE])
+    for action in _ACTIONS.finditer(kinds):
+        i = action.start()
+        kind, value, line, arg = EVENT.unpack_from(events, i * EVENT.size)
+        if kind == EV_GUESS:
+            game.make_guess(game.grid_lines[line].word)
+            if check and game.last_match_count != value:
+                raise ReplayError(f"guess on line {line} scored {game.last_match_count}, log says {value}")
+        elif kind == EV_BRACKET:
+            # The sequence used is the one under the cursor, so catch up with the last move
+            last_move = kinds.rfind(move, 0, i)
+            if last_move >= 0:
+                _, _, game.cursor_row, game.cursor_col = EVENT.unpack_from(events, last_move * EVENT.size)
+            dud_lines = len(game.dud_lines)
+            replenished = game.replenish_bracket_used
+            game.activate_bracket()
+            if check:
+                if len(game.dud_lines) < dud_lines:
+                    outcome = BRACKET_DUD
+                elif game.replenish_bracket_used and not replenished:
+                    outcome = BRACKET_RESET
+                else:
+                    outcome = BRACKET_NONE
+                if outcome != value or (outcome == BRACKET_DUD and not game.grid_lines[arg].removed):
+                    raise ReplayError(f"bracket on line {line} gave outcome {outcome}, log says {value}")
+        elif kind == EV_LOCKOUT:
+            if check and not game.locked_out:
+                raise ReplayError("log says locked out, replayed game isn't")
+        else:
+            raise ReplayError(f"unknown event kind {kind}")
+
+    # In between, only the last move matters
+    last_move = kinds.rfind(move)
+    if last_move >= 0:
+        _, _, game.cursor_row, game.cursor_col = EVENT.unpack_from(events, last_move * EVENT.size)
+    return game
+
+
+if __name__ == '__main__':
+    if len(sys.argv) not in (2, 3):
+        print("Syntax: hacking_replay.py LOG [DICTIONARY]")
+        sys.exit(2)
+    word_lists = None
+    if len(sys.argv) == 3:
+        from hacking_words import open_dictionary
+        word_lists = open_dictionary(sys.argv[2])
+
+    games = events = 0
+    outcomes = [0, 0, 0]
+    memo = GameMemo()
+    started = time.perf_counter()
+    for record in read_log(sys.argv[1]):
+        game = replay(record, word_lists, memo=memo)
+        final = STATUS_WON if game.won else STATUS_LOCKED_OUT if game.locked_out else STATUS_UNFINISHED
+        if final != record.status:
+            raise ReplayError(f"game {games} (seed {record.seed}) replayed to status {final}, "
+                              f"log says {record.status}")
+        outcomes[final] += 1
+        games += 1
+        events += len(record)
+    elapsed = time.perf_counter() - started
+    print(f"Replayed {games} games, {events} events in {elapsed:.2f}s "
+          f"({events / max(elapsed, 1e-9):.0f} events/s)")
+    print(f"Won {outcomes[STATUS_WON]}, locked out {outcomes[STATUS_LOCKED_OUT]}, "
+          f"unfinished {outcomes[STATUS_UNFINISHED]}")
@@ -0,0 +1,295 @@
+"""
+Asyncio terminal server for the hacking mini-game
+Hosts one HackingGame per telnet/raw TCP connection. Input is decoded from
+the socket without blocking, and frames are produced by GridRenderer as ANSI
+escape sequences, so a key press only sends the lines that changed.
+"""
+
+import asyncio
+import curses
+from typing import Callable, List, Optional
+
+from hacking_game import DEFAULT_GEOMETRY, Geometry, HackingGame, handle_key
+from hacking_ui import GridRenderer, draw_final_screen
+
+# Telnet protocol bytes
+IAC, DONT, DO, WONT, WILL, SB, SE = 255, 254, 253, 252, 251, 250, 240
+ECHO, SUPPRESS_GO_AHEAD = 1, 3
+# Ask telnet clients for character-at-a-time input without local echo
+TELNET_SETUP = bytes([IAC, WILL, ECHO, IAC, WILL, SUPPRESS_GO_AHEAD, IAC, DO, SUPPRESS_GO_AHEAD])
+
+HIDE_CURSOR = '\x1b[?25l'
+SHOW_CURSOR = '\x1b[?25h'
+
+READ_SIZE = 256  # Bytes read per wakeup; also caps per-session input buffering
+
+
+def park_row(geometry: Geometry) -> int:
+    """Row below the board and the final screen's prompt, where every frame leaves the cursor"""
+    return 5 + geometry.num_rows + 6
+
+
+def frame_end(geometry: Geometry) -> bytes:
+    """The cursor move that ends every frame on this geometry, which clients can split frames on"""
+    return f'\x1b[{park_row(geometry) + 1};1H'.encode('ascii')
+
+
+class AnsiScreen:
+    """Stand-in for a curses window that buffers ANSI escape sequences"""
+
+    def __init__(self, geometry: Geometry = DEFAULT_GEOMETRY):
+        self.buffer = []
+        self.row = -1
+        self.col = -1
+        self.park_row = park_row(geometry)
+        self.park = frame_end(geometry).decode('ascii')
+
+    def _move(self, row: int, col: int):
+        if (row, col) != (self.row, self.col):
+            self.buffer.append(f'\x1b[{row + 1};{col + 1}H')
+            self.row, self.col = row, col
+
+    def addstr(self, row: int, col: int, text: str, attr: int = 0):
+        self._move(row, col)
+        if attr:
+            codes = []
+            if attr & curses.A_BOLD:
+                codes.append('1')
+            if attr & curses.A_REVERSE:
+                codes.append('7')
+            self.buffer.append(f"\x1b[{';'.join(codes)}m{text}\x1b[0m")
+        else:
+            self.buffer.append(text)
+        self.col += len(text)
+
+    def move(self, row: int, col: int):
+        self._move(row, col)
+
+    def clrtoeol(self):
+        self.buffer.append('\x1b[K')
+
+    def erase(self):
+        self.buffer.append('\x1b[2J')
+
+    clear = erase
+
+    def noutrefresh(self):
+        pass
+
+    refresh = noutrefresh
+
+    def take(self) -> bytes:
+        """Return and clear everything buffered since the last call, ending with the park move"""
+        if not self.buffer:
+            return b''
+        self.buffer.append(self.park)
+        self.row, self.col = self.park_row, 0
+        data = ''.join(self.buffer).encode('utf-8')
+        self.buffer = []
+        return data
+
+
+class AnsiRenderer(GridRenderer):
+    """GridRenderer whose frames are collected from an AnsiScreen instead of curses"""
+
+    def flush(self, stdscr):
+        pass
+
+
+class KeyDecoder:
+    """Turns raw telnet/terminal bytes into curses key codes, skipping telnet negotiation"""
+
+    CSI_KEYS = {ord('A'): curses.KEY_UP, ord('B'): curses.KEY_DOWN,
+                ord('C'): curses.KEY_RIGHT, ord('D'): curses.KEY_LEFT, ord('Z'): curses.KEY_BTAB}
+
+    def __init__(self):
+        self.state = 'data'
+        self.after_cr = False
+
+    def feed(self, data: bytes) -> List[int]:
+        keys = []
+        for byte in data:
+            state = self.state
+            if state == 'data':
+                if byte == IAC:
+                    self.state = 'iac'
+                elif byte == 0x1b:
+                    self.state = 'esc'
+                elif byte == 13:
+                    keys.append(10)
+                    self.after_cr = True
+                    continue
+                elif byte in (0, 10) and self.after_cr:
+                    pass  # Second half of a telnet CR LF / CR NUL
+                elif byte != 0:
+                    keys.append(byte)
+            elif state == 'iac':
+                if byte in (WILL, WONT, DO, DONT):
+                    self.state = 'option'
+                elif byte == SB:
+                    self.state = 'sub'
+                else:
+                    self.state = 'data'
+            elif state == 'option':
+                self.state = 'data'
+            elif state == 'sub':
+                if byte == IAC:
+                    self.state = 'sub_iac'
+            elif state == 'sub_iac':
+                self.state = 'data' if byte == SE else 'sub'
+            elif state == 'esc':
+                if byte in (ord('['), ord('O')):
+                    self.state = 'csi'
+                else:
+                    # A lone Escape key press; the byte after it is ordinary input
+                    keys.append(0x1b)
+                    self.state = 'data'
+                    keys.extend(self.feed(bytes((byte,))))
+                    continue  # feed() has already set after_cr for this byte
+            elif state == 'csi':
+                if 0x40 <= byte <= 0x7e:  # Final byte of the sequence
+                    if byte in self.CSI_KEYS:
+                        keys.append(self.CSI_KEYS[byte])
+                    self.state = 'data'
+            self.after_cr = False
+        return keys
+
+
+class HackingServer:
+    """Serves one game per connection; sessions are plain coroutines, so idle ones cost little"""
+
+    def __init__(self, difficulty: int, host: str = '127.0.0.1', port: int = 2323,
+                 max_sessions: int = 10000, idle_timeout: float = 900.0,
+                 game_factory: Optional[Callable[[int], HackingGame]] = None,
+                 on_game_end: Optional[Callable[[HackingGame], None]] = None):
+        self.difficulty = difficulty
+        self.host = host
+        self.port = port
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.game_factory = game_factory or HackingGame
+        self.on_game_end = on_game_end  # Sees every game, including ones cut short by a disconnect
+        self.sessions_active = 0
+        self.sessions_total = 0
+        self.sessions_rejected = 0
+        self.bytes_sent = 0
+        self.keys_received = 0
+
+    async def serve(self):
+        server = await asyncio.start_server(self._handle, self.host, self.port,
+                                            limit=READ_SIZE * 4, backlog=1024)
+        async with server:
+            await server.serve_forever()
+
+    def stats(self) -> dict:
+        return {
+            'sessions_active': self.sessions_active,
+            'sessions_total': self.sessions_total,
+            'sessions_rejected': self.sessions_rejected,
+            'bytes_sent': self.bytes_sent,
+            'keys_received': self.keys_received,
+        }
+
+    async def _send(self, writer: asyncio.StreamWriter, data: bytes):
+        if data:
+            writer.write(data)
+            self.bytes_sent += len(data)
+            await writer.drain()  # Back-pressure keeps the write buffer bounded
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        if self.sessions_active >= self.max_sessions:
+            self.sessions_rejected += 1
+            writer.write(b"Too many sessions, try again later.\r\n")
+            writer.close()
+            return
+
+        self.sessions_active += 1
+        self.sessions_total += 1
+        try:
+            await self._run_session(reader, writer)
+        except (ConnectionError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.sessions_active -= 1
+            try:
+                writer.write(SHOW_CURSOR.encode('ascii'))
+                writer.close()
+            except (ConnectionError, RuntimeError):
+                pass
+
+    async def _run_session(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        decoder = KeyDecoder()
+        game = self.game_factory(self.difficulty)
+        screen = AnsiScreen(game.geometry)
+        prefix = TELNET_SETUP + HIDE_CURSOR.encode('ascii')
+
+        while True:
+            renderer = AnsiRenderer(5)
+            renderer.render(screen, game)
+            await self._send(writer, prefix + screen.take())
+            prefix = b''
+
+            try:
+                retry = await self._play(reader, writer, decoder, screen, renderer, game)
+            finally:
+                if self.on_game_end is not None:
+                    self.on_game_end(game)
+
+            if not retry:
+                return
+            screen.erase()
+            game = self.game_factory(self.difficulty)
+
+    async def _play(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                    decoder: KeyDecoder, screen: AnsiScreen, renderer: AnsiRenderer,
+                    game: HackingGame) -> bool:
+        """Run one game on an open connection; returns True if the player asked to retry"""
+        while True:
+            data = await asyncio.wait_for(reader.read(READ_SIZE), self.idle_timeout)
+            if not data:
+                return False
+            keys = decoder.feed(data)
+            self.keys_received += len(keys)
+            for key in keys:
+                if game.game_over:
+                    return key in (ord('r'), ord('R'))
+                if key in (ord('q'), ord('Q')):
+                    game.game_over = True
+                else:
+                    handle_key(game, key)
+                if game.game_over:
+                    draw_final_screen(screen, game, "Press R to retry or any other key to disconnect...")
+                    break
+            else:
+                # All keys of this read are applied before one frame goes out
+                renderer.render(screen, game)
+            await self._send(writer, screen.take())
+
+
+def _raise_fd_limit():
+    """Allow as many sockets as the hard limit permits (Unix only)"""
+    try:
+        import resource
+    except ImportError:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if hard == resource.RLIM_INFINITY or soft < hard:
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+        except (ValueError, OSError):
+            pass
+
+
+def run(difficulty: int, port: int, host: str = '127.0.0.1', max_sessions: int = 10000,
+        game_factory: Optional[Callable[[int], HackingGame]] = None,
+        on_game_end: Optional[Callable[[HackingGame], None]] = None):
+    """Run the server until interrupted, then print its counters"""
+    _raise_fd_limit()
+    server = HackingServer(difficulty, host, port, max_sessions, game_factory=game_factory,
+                           on_game_end=on_game_end)
+    print(f"Serving difficulty {difficulty} on {host}:{port} (telnet {host} {port}), Ctrl-C to stop")
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        pass
+    print(server.stats())
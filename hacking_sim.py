@@ -0,0 +1,318 @@
+"""
+Headless simulation of HackingGame rounds
+Plays games through make_guess/activate_bracket without curses, using a
+pluggable guessing strategy, and aggregates the results for balancing
+DIFFICULTY_CONFIG.
+"""
+
+import hashlib
+import random
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from hacking_game import DIFFICULTY_CONFIG, Geometry, HackingGame
+from hacking_solver import Solver
+
+
+class Strategy:
+    """Base guessing strategy. Subclasses override pick_guess (and observe if they learn)."""
+    name = 'base'
+    use_brackets = False  # Activate every bracket before the first guess
+
+    def __init__(self, rng: Optional[random.Random] = None):
+        self.rng = rng if rng is not None else random.Random()
+
+    def start(self, game: HackingGame):
+        """Called once per game before the first guess"""
+        self.tried = set()
+
+    def remaining_words(self, game: HackingGame) -> List[str]:
+        """Words still on the board that have not been tried yet"""
+        removed = game.removed_words
+        return [w for w in game.words if w not in removed and w not in self.tried]
+
+    def pick_guess(self, game: HackingGame) -> str:
+        raise NotImplementedError
+
+    def observe(self, game: HackingGame, word: str, matches: int):
+        """Called after each guess with the likeness reported by the terminal"""
+        self.tried.add(word)
+
+
+class RandomStrategy(Strategy):
+    """Guess any untried word, ignoring the likeness feedback"""
+    name = 'random'
+
+    def pick_guess(self, game: HackingGame) -> str:
+        return self.rng.choice(self.remaining_words(game))
+
+
+class EliminateStrategy(Strategy):
+    """Only guess words consistent with every likeness seen so far"""
+    name = 'eliminate'
+
+    def start(self, game: HackingGame):
+        super().start(game)
+        self.history = []
+
+    def pick_guess(self, game: HackingGame) -> str:
+        candidates = [w for w in self.remaining_words(game)
+                      if all(_likeness(w, guess) == matches for guess, matches in self.history)]
+        return self.rng.choice(candidates or self.remaining_words(game))
+
+    def observe(self, game: HackingGame, word: str, matches: int):
+        super().observe(game, word, matches)
+        self.history.append((word, matches))
+
+
+class BracketEliminateStrategy(EliminateStrategy):
+    """Use every bracket sequence first, then eliminate"""
+    name = 'brackets'
+    use_brackets = True
+
+
+class SolverStrategy(Strategy):
+    """Use every bracket, then follow the likeness-matrix solver"""
+    name = 'minimax'
+    rule = 'minimax'
+    use_brackets = True
+
+    def start(self, game: HackingGame):
+        super().start(game)
+        self.solver = Solver(game.words, self.rule)
+        self.removed = set()
+
+    def pick_guess(self, game: HackingGame) -> str:
+        for word in game.removed_words:
+            if word not in self.removed:
+                self.removed.add(word)
+                self.solver.remove(word)
+        return self.solver.best_guess() or self.rng.choice(self.remaining_words(game))
+
+    def observe(self, game: HackingGame, word: str, matches: int):
+        super().observe(game, word, matches)
+        self.solver.update(word, matches)
+
+
+class ExpectedSolverStrategy(SolverStrategy):
+    """Like minimax, but minimises the expected number of remaining candidates"""
+    name = 'expected'
+    rule = 'expected'
+
+
+STRATEGIES = {
+    RandomStrategy.name: RandomStrategy,
+    EliminateStrategy.name: EliminateStrategy,
+    BracketEliminateStrategy.name: BracketEliminateStrategy,
+    SolverStrategy.name: SolverStrategy,
+    ExpectedSolverStrategy.name: ExpectedSolverStrategy,
+}
+
+
+def _likeness(a: str, b: str) -> int:
+    # Same rule as HackingGame.count_matches
+    return sum(1 for x, y in zip(a, b) if x == y)
+
+
+class SimulationStats:
+    """Aggregated results of many simulated games. Mergeable, so batches can be combined."""
+
+    def __init__(self, difficulty: int, strategy: str):
+        self.difficulty = difficulty
+        self.strategy = strategy
+        self.games = 0
+        self.wins = 0
+        self.lockouts = 0
+        self.guesses = 0
+        self.guess_histogram = {}  # guesses used -> number of games
+        self.brackets_used = 0
+        self.duds_removed = 0
+        self.attempts_reset = 0
+
+    def merge(self, other: 'SimulationStats'):
+        self.games += other.games
+        self.wins += other.wins
+        self.lockouts += other.lockouts
+        self.guesses += other.guesses
+        for used, count in other.guess_histogram.items():
+            self.guess_histogram[used] = self.guess_histogram.get(used, 0) + count
+        self.brackets_used += other.brackets_used
+        self.duds_removed += other.duds_removed
+        self.attempts_reset += other.attempts_reset
+
+    def to_dict(self) -> dict:
+        return {
+            'difficulty': self.difficulty,
+            'strategy': self.strategy,
+            'games': self.games,
+            'wins': self.wins,
+            'lockouts': self.lockouts,
+            'guesses': self.guesses,
+            'guess_histogram': {str(k): v for k, v in sorted(self.guess_histogram.items())},
+            'brackets_used': self.brackets_used,
+            'duds_removed': self.duds_removed,
+            'attempts_reset': self.attempts_reset,
+        }
+
+    def format_report(self) -> str:
+        games = max(1, self.games)
+        name = DIFFICULTY_CONFIG[self.difficulty]['name']
+        lines = [
+            f"Difficulty {self.difficulty} ({name}), strategy '{self.strategy}': {self.games} games",
+            f"  Win rate:        {100.0 * self.wins / games:6.2f}%",
+            f"  Lockout rate:    {100.0 * self.lockouts / games:6.2f}%",
+            f"  Guesses/game:    {self.guesses / games:6.2f}",
+            f"  Brackets/game:   {self.brackets_used / games:6.2f}"
+            f" (duds removed {self.duds_removed}, attempts reset {self.attempts_reset})",
+            "  Guesses used:",
+        ]
+        for used, count in sorted(self.guess_histogram.items()):
+            lines.append(f"    {used:3d}: {count} ({100.0 * count / games:.2f}%)")
+        return '\n'.join(lines)
+
+
+def use_bracket(game: HackingGame, line_idx: int) -> str:
+    """Move the cursor onto the first bracket sequence of a line and activate it"""
+    game.move_cursor(line_idx, min(game.grid_lines[line_idx].brackets()))
+    _, outcome = game.activate_bracket()
+    return outcome
+
+
+def play_game(game: HackingGame, strategy: Strategy, stats: SimulationStats):
+    """Play one game to the end and add its result to stats"""
+    strategy.start(game)
+
+    if strategy.use_brackets:
+        # Using a sequence can uncover another (a removed dud frees its line),
+        # but every use consumes two brackets, so this ends
+        while game.bracket_lines and not game.game_over:
+            outcome = use_bracket(game, min(game.bracket_lines))
+            stats.brackets_used += 1
+            if outcome == "Dud removed":
+                stats.duds_removed += 1
+            elif outcome == "Attempts reset":
+                stats.attempts_reset += 1
+
+    guesses = 0
+    max_guesses = len(game.words)  # Every word tried once is always enough
+    while not game.game_over and guesses < max_guesses:
+        word = strategy.pick_guess(game)
+        game.make_guess(word)
+        guesses += 1
+        strategy.observe(game, word, game.last_match_count)
+
+    stats.games += 1
+    stats.guesses += guesses
+    stats.guess_histogram[guesses] = stats.guess_histogram.get(guesses, 0) + 1
+    if game.won:
+        stats.wins += 1
+    if game.locked_out:
+        stats.lockouts += 1
+
+
+def simulate(num_games: int, difficulty: int, strategy: str = 'eliminate',
+             stats: Optional[SimulationStats] = None,
+             word_lists: Optional[dict] = None, seed: Optional[int] = None,
+             geometry: Optional[Geometry] = None, telemetry=None) -> SimulationStats:
+    """Play num_games headless games and return the aggregated stats.
+
+    Every game is also recorded into telemetry (a hacking_telemetry.Telemetry), if given.
+    """
+    if stats is None:
+        stats = SimulationStats(difficulty, strategy)
+    if telemetry is not None:
+        from hacking_telemetry import GameResult
+    seeds = random.Random(seed)
+    player = STRATEGIES[strategy](random.Random(seeds.getrandbits(64)))
+    for _ in range(num_games):
+        game = HackingGame(difficulty, record_history=False, word_lists=word_lists,
+                           seed=seeds.getrandbits(64), geometry=geometry)
+        play_game(game, player, stats)
+        if telemetry is not None:
+            telemetry.record(GameResult.from_game(game))
+    return stats
+
+
+# Games are split into fixed-size chunks, each with a seed derived from the
+# master seed and the chunk's position. The split therefore does not depend on
+# the number of workers, and since merging stats only adds counters, the final
+# aggregates are identical however the chunks are scheduled. The chunk size is
+# part of that mapping from seed to games, so it is fixed: changing it changes
+# every result for a given --seed.
+CHUNK_SIZE = 1000
+
+
+def derive_seed(master_seed: int, *keys) -> int:
+    """Deterministic 64-bit seed for a sub-stream of the master seed"""
+    data = repr((master_seed,) + keys).encode('utf-8')
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'big')
+
+
+def _run_chunk(task: tuple) -> Tuple[tuple, SimulationStats, object]:
+    """Worker entry point: play one chunk and return its partial aggregates"""
+    key, num_games, chunk_seed, word_lists, geometry, collect = task
+    difficulty, _variant, strategy = key
+    telemetry = None
+    if collect:
+        from hacking_telemetry import Telemetry
+        telemetry = Telemetry()
+    stats = simulate(num_games, difficulty, strategy, word_lists=word_lists, seed=chunk_seed,
+                     geometry=geometry, telemetry=telemetry)
+    return key, stats, telemetry
+
+
+def _chunk_tasks(num_games: int, key: tuple, seed: int, word_lists: Optional[dict],
+                 geometry: Optional[Geometry] = None, collect: bool = False) -> Iterable[tuple]:
+    for chunk_idx, first in enumerate(range(0, num_games, CHUNK_SIZE)):
+        count = min(CHUNK_SIZE, num_games - first)
+        yield key, count, derive_seed(seed, *key, chunk_idx), word_lists, geometry, collect
+
+
+def sweep(num_games: int, difficulties: Iterable[int], strategies: Iterable[str],
+          word_list_variants: Optional[Dict[str, dict]] = None, seed: int = 0,
+          workers: Optional[int] = None,
+          geometry: Optional[Geometry] = None, telemetry=None) -> Dict[tuple, SimulationStats]:
+    """Play num_games for every difficulty x word-list variant x strategy.
+
+    Returns a dict keyed by (difficulty, variant, strategy). Chunks run on a
+    process pool (or inline when workers == 1) and only their aggregated
+    SimulationStats travel back to the parent. With a hacking_telemetry
+    Telemetry, each chunk also sends back its own, merged into it as chunks
+    finish.
+    """
+    if word_list_variants is None:
+        word_list_variants = {'default': None}
+
+    results = {}
+    tasks = []
+    for difficulty in difficulties:
+        for variant, word_lists in word_list_variants.items():
+            for strategy in strategies:
+                key = (difficulty, variant, strategy)
+                results[key] = SimulationStats(difficulty, strategy)
+                tasks.extend(_chunk_tasks(num_games, key, seed, word_lists, geometry, telemetry is not None))
+
+    def merge(key, partial, chunk_telemetry):
+        results[key].merge(partial)
+        if chunk_telemetry is not None:
+            telemetry.merge(chunk_telemetry)
+
+    if workers == 1:
+        for task in tasks:
+            merge(*_run_chunk(task))
+        return results
+
+    # Imported here: it costs more start-up time than a small single-process run takes
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_run_chunk, task) for task in tasks]
+        for future in as_completed(futures):
+            merge(*future.result())
+    return results
+
+
+def run_parallel(num_games: int, difficulty: int, strategy: str = 'eliminate', seed: int = 0,
+                 workers: Optional[int] = None, word_lists: Optional[dict] = None) -> SimulationStats:
+    """Play num_games across a process pool; reproducible for a given seed"""
+    variants = {'default': word_lists}
+    results = sweep(num_games, [difficulty], [strategy], variants, seed, workers)
+    return results[(difficulty, 'default', strategy)]
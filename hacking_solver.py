@@ -0,0 +1,178 @@
+"""
+Likeness-matrix solver for the hacking mini-game
+Builds the pairwise positional-match matrix of a board's words once, then
+picks guesses by minimax (smallest worst-case candidate set) or by smallest
+expected candidate set, narrowing the candidates after each likeness result.
+likeness_table scores whole lists of guesses against lists of passwords in
+one call, for analysis jobs and hints.
+"""
+
+from typing import List, Optional, Sequence
+
+_np = None  # NumPy once imported, or False if it isn't installed
+
+
+def _numpy():
+    """NumPy, imported on first use as it dominates start-up time; None if unavailable"""
+    global _np
+    if _np is None:
+        try:
+            import numpy
+            _np = numpy
+        except ImportError:  # NumPy is optional, the pure-Python path gives the same answers
+            _np = False
+    return _np or None
+
+
+BLOCK_CELLS = 1 << 18  # Cells compared per NumPy pass, small enough to stay in cache
+
+
+def likeness_table(guesses: Sequence[str], passwords: Sequence[str], use_numpy: bool = True):
+    """Positional matches of every guess against every password (guesses x passwords).
+
+    Same rule as HackingGame.count_matches: words of different lengths are
+    compared up to the shorter one, like zip(). Returns a NumPy uint8 array
+    when NumPy is available, else a list of bytes rows, one per guess. Either
+    way 10k x 10k words take about a second or less, against minutes for
+    count_matches in a loop.
+    """
+    width = min(max(map(len, guesses), default=0), max(map(len, passwords), default=0))
+    if width > 255:
+        raise ValueError("likeness is counted in bytes, so words can't share more than 255 positions")
+    np = _numpy() if use_numpy else None
+    if np is not None:
+        return _likeness_numpy(np, guesses, passwords, width)
+    return _likeness_lanes(guesses, passwords)
+
+
+def likeness_matrix(words: Sequence[str], use_numpy: bool = True):
+    """N x N likeness_table of words against themselves"""
+    return likeness_table(words, words, use_numpy)
+
+
+def _pack(np, words: Sequence[str], width: int, pad: int):
+    """Words as a len(words) x width uint8 array, cut or padded to width"""
+    padding = bytes([pad])
+    data = b''.join(word.encode('ascii')[:width].ljust(width, padding) for word in words)
+    return np.frombuffer(data, dtype=np.uint8).reshape(len(words), width)
+
+
+def _likeness_numpy(np, guesses: Sequence[str], passwords: Sequence[str], width: int):
+    # Each side has its own pad byte, neither of them ASCII, so padding never matches
+    rows = _pack(np, guesses, width, 0x80)
+    columns = np.ascontiguousarray(_pack(np, passwords, width, 0x81).T)
+    result = np.zeros((len(guesses), len(passwords)), dtype=np.uint8)
+    block = max(1, BLOCK_CELLS // max(len(passwords), 1))
+    same = np.empty((block, len(passwords)), dtype=bool)
+    for start in range(0, len(guesses), block):
+        end = min(start + block, len(guesses))
+        counts = result[start:end]
+        matches = same[:end - start]
+        for pos in range(width):
+            np.equal(rows[start:end, pos, None], columns[pos], out=matches)
+            counts += matches.view(np.uint8)
+    return result
+
+
+def _likeness_lanes(guesses: Sequence[str], passwords: Sequence[str]) -> List[bytes]:
+    # Pure Python: an int holding one byte lane per password. Summing the lanes
+    # of each (position, letter) of a guess counts its matches with every
+    # password at once; a lane never carries over as no count exceeds 255.
+    n = len(passwords)
+    lanes = {}  # (position, letter) -> bytearray with a 1 for each password that has it
+    for i, word in enumerate(passwords):
+        for key in enumerate(word):
+            lane = lanes.get(key)
+            if lane is None:
+                lane = lanes[key] = bytearray(n)
+            lane[i] = 1
+    masks = {key: int.from_bytes(lane, 'little') for key, lane in lanes.items()}
+    rows = []
+    for word in guesses:
+        total = 0
+        for key in enumerate(word):
+            mask = masks.get(key)
+            if mask is not None:
+                total += mask
+        rows.append(total.to_bytes(n, 'little'))
+    return rows
+
+
+class Solver:
+    """Tracks the passwords still possible on one board and suggests the next guess"""
+
+    RULES = ('minimax', 'expected')
+
+    def __init__(self, words: Sequence[str], rule: str = 'minimax', use_numpy: bool = True):
+        if rule not in self.RULES:
+            raise ValueError(f"Unknown rule '{rule}', expected one of {self.RULES}")
+        self.words = list(dict.fromkeys(words))  # Drop duplicates, keep order
+        self.index = {word: i for i, word in enumerate(self.words)}
+        self.rule = rule
+        self.vectorised = use_numpy and _numpy() is not None
+        self.matrix = likeness_matrix(self.words, self.vectorised)
+        self.max_likeness = max((len(w) for w in self.words), default=0)
+        self.candidates = list(range(len(self.words)))  # Indices of possible passwords
+        self.unavailable = set()  # Indices that were guessed or removed as duds
+
+    def remaining(self) -> List[str]:
+        """Words that can still be the password"""
+        return [self.words[i] for i in self.candidates]
+
+    def remove(self, word: str):
+        """A dud was removed by a bracket sequence"""
+        i = self.index[word]
+        self.unavailable.add(i)
+        if i in self.candidates:
+            self.candidates.remove(i)
+
+    def update(self, word: str, matches: int):
+        """Keep only the candidates that would have produced this likeness"""
+        g = self.index[word]
+        self.unavailable.add(g)
+        # A correct guess ends the game, so g itself is never left as a candidate
+        row = self.matrix[g]
+        self.candidates = [c for c in self.candidates if c != g and row[c] == matches]
+
+    def best_guess(self) -> Optional[str]:
+        """Guess that splits the remaining candidates best under the chosen rule"""
+        if not self.candidates:
+            return None
+        if len(self.candidates) <= 2:
+            return self.words[self.candidates[0]]
+
+        guesses = [i for i in range(len(self.words)) if i not in self.unavailable]
+        candidate_set = set(self.candidates)
+        best = None
+        best_key = None
+        for g, counts in zip(guesses, self._partition_sizes(guesses)):
+            if g in candidate_set:
+                # Guessing the password wins, so its own bucket leaves nothing
+                counts[int(self.matrix[g][g])] -= 1
+            if self.rule == 'minimax':
+                score = max(counts)
+            else:
+                score = sum(n * n for n in counts)
+            key = (score, g not in candidate_set, g)
+            if best_key is None or key < best_key:
+                best, best_key = g, key
+        return self.words[best]
+
+    def _partition_sizes(self, guesses: List[int]) -> list:
+        """For each guess, how many candidates fall into each likeness bucket"""
+        bins = self.max_likeness + 1
+        if self.vectorised:
+            np = _numpy()
+            sub = self.matrix[np.ix_(guesses, self.candidates)].astype(np.intp)
+            offsets = np.arange(len(guesses))[:, None] * bins
+            counts = np.bincount((sub + offsets).ravel(), minlength=len(guesses) * bins)
+            return counts.reshape(len(guesses), bins).tolist()
+
+        result = []
+        for g in guesses:
+            counts = [0] * bins
+            row = self.matrix[g]
+            for c in self.candidates:
+                counts[row[c]] += 1
+            result.append(counts)
+        return result
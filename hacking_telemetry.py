@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+Streaming telemetry for the hacking mini-game
+Finished games are reduced to a GameResult as they end and fed through
+generator stages into constant-memory aggregators, so no game is kept:
+running moments, fixed-bucket histograms and log-linear quantile sketches,
+per difficulty tier. Every aggregator merges with another of its kind (e.g.
+from a worker process) and is exported to JSON or CSV, on demand, every few
+seconds as results arrive, or every few seconds on a background thread.
+
+    telemetry = Telemetry('stats.json', interval=10.0)
+    for result in telemetry.consume(results(games)):
+        ...
+    telemetry.export()
+
+Push-style sources (the server, the interactive game) send games into
+telemetry.collector() instead, with telemetry.start() so the export keeps
+its interval while no game finishes.
+"""
+
+import csv
+import io
+import json
+import math
+import os
+import sys
+import threading
+import time
+from typing import Dict, Generator, Iterable, Iterator, List, Optional
+
+from hacking_game import DIFFICULTY_CONFIG, HackingGame
+from hacking_profile import LatencyHistogram
+
+EXPORT_INTERVAL = 10.0  # Seconds between exports while results keep coming
+GUESS_BUCKETS = 32  # Guesses-to-solve histogram: 0..30 exactly, the last bucket holds 31 and up
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class GameResult:
+    """What telemetry keeps of one finished game"""
+
+    __slots__ = ('difficulty', 'won', 'locked_out', 'guesses', 'brackets_used', 'duds_removed',
+                 'attempts_reset', 'duration_ns')
+
+    def __init__(self, difficulty: int, won: bool, locked_out: bool, guesses: int, brackets_used: int,
+                 duds_removed: int, attempts_reset: bool, duration_ns: int):
+        self.difficulty = difficulty
+        self.won = won
+        self.locked_out = locked_out
+        self.guesses = guesses
+        self.brackets_used = brackets_used
+        self.duds_removed = duds_removed
+        self.attempts_reset = attempts_reset
+        self.duration_ns = duration_ns
+
+    @classmethod
+    def from_game(cls, game: HackingGame) -> 'GameResult':
+        """Result of a game that just ended (or was abandoned); its duration runs until now"""
+        return cls(game.difficulty, game.won, game.locked_out, game.guesses, game.brackets_used,
+                   game.duds_removed, game.replenish_bracket_used,
+                   int((time.monotonic() - game.started_at) * 1e9))
+
+
+def results(games: Iterable[HackingGame]) -> Iterator[GameResult]:
+    """Pipeline source: one GameResult per finished game"""
+    for game in games:
+        yield GameResult.from_game(game)
+
+
+class RunningMoments:
+    """Count, mean, variance, min and max of a stream in O(1) memory (Welford)"""
+
+    __slots__ = ('count', 'mean', 'm2', 'min', 'max')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # Sum of squared differences from the mean
+        self.min = None
+        self.max = None
+
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def merge(self, other: 'RunningMoments'):
+        # Chan et al.'s pairwise update, exact for any split of the stream
+        if not other.count:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.mean += delta * other.count / count
+        self.count = count
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+
+    @property
+    def stddev(self) -> float:
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    def to_dict(self) -> dict:
+        return {'count': self.count, 'mean': self.mean, 'stddev': self.stddev, 'm2': self.m2,
+                'min': self.min, 'max': self.max}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'RunningMoments':
+        moments = cls()
+        moments.count = data['count']
+        moments.mean = data['mean']
+        moments.m2 = data['m2']
+        moments.min = data['min']
+        moments.max = data['max']
+        return moments
+
+
+class Histogram:
+    """Counts of small non-negative integers; the last bucket also takes everything above it"""
+
+    __slots__ = ('counts',)
+
+    def __init__(self, num_buckets: int):
+        self.counts = [0] * num_buckets
+
+    def add(self, value: int):
+        self.counts[min(value, len(self.counts) - 1)] += 1
+
+    def merge(self, other: 'Histogram'):
+        if len(other.counts) != len(self.counts):
+            raise ValueError("can't merge histograms with different buckets")
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+
+    def to_dict(self) -> List[int]:
+        return list(self.counts)
+
+    @classmethod
+    def from_dict(cls, counts: List[int]) -> 'Histogram':
+        hist = cls(len(counts))
+        hist.counts = list(counts)
+        return hist
+
+
+class TierStats:
+    """Aggregates of every game played at one difficulty tier"""
+
+    COUNTERS = ('games', 'wins', 'lockouts', 'brackets_used', 'duds_removed', 'attempts_reset')
+
+    def __init__(self, difficulty: int):
+        self.difficulty = difficulty
+        self.games = 0
+        self.wins = 0
+        self.lockouts = 0
+        self.brackets_used = 0
+        self.duds_removed = 0
+        self.attempts_reset = 0
+        self.guesses = RunningMoments()
+        self.guess_histogram = Histogram(GUESS_BUCKETS)
+        self.solved_in = Histogram(GUESS_BUCKETS)  # Guesses used by the games that were won
+        self.duration = LatencyHistogram()  # Nanoseconds per game, as a quantile sketch
+
+    def record(self, result: GameResult):
+        self.games += 1
+        self.wins += result.won
+        self.lockouts += result.locked_out
+        self.brackets_used += result.brackets_used
+        self.duds_removed += result.duds_removed
+        self.attempts_reset += result.attempts_reset
+        self.guesses.add(result.guesses)
+        self.guess_histogram.add(result.guesses)
+        if result.won:
+            self.solved_in.add(result.guesses)
+        self.duration.record(result.duration_ns)
+
+    def merge(self, other: 'TierStats'):
+        for name in self.COUNTERS:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        self.guesses.merge(other.guesses)
+        self.guess_histogram.merge(other.guess_histogram)
+        self.solved_in.merge(other.solved_in)
+        self.duration.merge(other.duration)
+
+    def rates(self) -> Dict[str, float]:
+        games = max(1, self.games)
+        bracket_outcomes = max(1, self.duds_removed + self.attempts_reset)
+        return {
+            'win_rate': self.wins / games,
+            'lockout_rate': self.lockouts / games,
+            'brackets_per_game': self.brackets_used / games,
+            'dud_removal_share': self.duds_removed / bracket_outcomes,
+            'replenish_share': self.attempts_reset / bracket_outcomes,
+        }
+
+    def duration_quantiles_ms(self) -> Dict[str, float]:
+        return {f'p{round(q * 100)}': self.duration.percentile(q) / 1e6 for q in QUANTILES}
+
+    def to_dict(self) -> dict:
+        data = {'difficulty': self.difficulty, 'name': DIFFICULTY_CONFIG[self.difficulty]['name']}
+        data.update((name, getattr(self, name)) for name in self.COUNTERS)
+        data.update(self.rates())
+        data['duration_ms'] = self.duration_quantiles_ms()
+        data['guesses'] = self.guesses.to_dict()
+        data['guess_histogram'] = self.guess_histogram.to_dict()
+        data['solved_in'] = self.solved_in.to_dict()
+        data['duration_sketch'] = self.duration.to_dict()
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'TierStats':
+        stats = cls(data['difficulty'])
+        for name in cls.COUNTERS:
+            setattr(stats, name, data[name])
+        stats.guesses = RunningMoments.from_dict(data['guesses'])
+        stats.guess_histogram = Histogram.from_dict(data['guess_histogram'])
+        stats.solved_in = Histogram.from_dict(data['solved_in'])
+        stats.duration = LatencyHistogram.from_dict(data['duration_sketch'])
+        return stats
+
+
+class Telemetry:
+    """Per-tier aggregates of a stream of GameResults, exported to path every interval seconds.
+
+    Memory use doesn't grow with the number of games. The export format
+    follows the extension of path: .csv for one row per tier, else JSON.
+    A JSON export holds the full state, so Telemetry.load and merge combine
+    exports from separate runs or processes.
+    """
+
+    def __init__(self, path: Optional[str] = None, interval: float = EXPORT_INTERVAL):
+        self.tiers: Dict[int, TierStats] = {}
+        self.path = path
+        self.interval = interval
+        self._next_export = time.monotonic() + interval
+        self._lock = threading.Lock()  # Held while the export thread reads the aggregates
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __getstate__(self) -> dict:
+        # Worker processes send their Telemetry back pickled; the lock and thread stay behind
+        state = self.__dict__.copy()
+        del state['_lock'], state['_stop']
+        state['_thread'] = None
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def start(self) -> 'Telemetry':
+        """Export every interval seconds from a background thread, whether or not games finish"""
+        if self.path is not None and self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='telemetry-export', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the export thread; the last export is left to the caller or the collector"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.export()
+
+    def tier(self, difficulty: int) -> TierStats:
+        stats = self.tiers.get(difficulty)
+        if stats is None:
+            stats = self.tiers[difficulty] = TierStats(difficulty)
+        return stats
+
+    def record(self, result: GameResult):
+        with self._lock:
+            self.tier(result.difficulty).record(result)
+        self.tick()
+
+    def merge(self, other: 'Telemetry'):
+        with self._lock:
+            for difficulty, stats in other.tiers.items():
+                self.tier(difficulty).merge(stats)
+        self.tick()
+
+    def tick(self):
+        """Export if the interval has passed since the last export (the export thread does it once started)"""
+        if self.path is not None and self._thread is None:
+            now = time.monotonic()
+            if now >= self._next_export:
+                self.export()
+                self._next_export = now + self.interval
+
+    def consume(self, items: Iterable[GameResult]) -> Iterator[GameResult]:
+        """Pipeline stage: record every result and pass it on"""
+        for result in items:
+            self.record(result)
+            yield result
+
+    def collector(self) -> Generator[None, HackingGame, None]:
+        """Started generator to send() finished games into; closing it exports a last time"""
+        def collect():
+            try:
+                while True:
+                    game = yield
+                    self.record(GameResult.from_game(game))
+            finally:
+                if self.path is not None:
+                    self.export()
+        sink = collect()
+        next(sink)
+        return sink
+
+    def to_dict(self) -> dict:
+        return {'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'tiers': [self.tiers[d].to_dict() for d in sorted(self.tiers)]}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Telemetry':
+        telemetry = cls()
+        for tier in data['tiers']:
+            telemetry.tiers[tier['difficulty']] = TierStats.from_dict(tier)
+        return telemetry
+
+    @classmethod
+    def load(cls, path: str) -> 'Telemetry':
+        """Read back a JSON export"""
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+    def to_csv(self) -> str:
+        columns = (['difficulty', 'name'] + list(TierStats.COUNTERS) + list(TierStats(1).rates())
+                   + ['guesses_mean', 'guesses_stddev']
+                   + [f'duration_{q}_ms' for q in TierStats(1).duration_quantiles_ms()]
+                   + [f'guesses_{n}' for n in range(GUESS_BUCKETS)])
+        out = io.StringIO()
+        writer = csv.writer(out)
+        writer.writerow(columns)
+        for difficulty in sorted(self.tiers):
+            stats = self.tiers[difficulty]
+            writer.writerow([difficulty, DIFFICULTY_CONFIG[difficulty]['name']]
+                            + [getattr(stats, name) for name in TierStats.COUNTERS]
+                            + [f'{rate:.6f}' for rate in stats.rates().values()]
+                            + [f'{stats.guesses.mean:.4f}', f'{stats.guesses.stddev:.4f}']
+                            + [f'{ms:.3f}' for ms in stats.duration_quantiles_ms().values()]
+                            + stats.guess_histogram.counts)
+        return out.getvalue()
+
+    def export(self, path: Optional[str] = None):
+        """Write the current aggregates; readers never see a half-written file"""
+        path = path or self.path
+        with self._lock:
+            if path.endswith('.csv'):
+                text = self.to_csv()
+            else:
+                text = json.dumps(self.to_dict(), indent=2)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', newline='') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+    def format_report(self) -> str:
+        lines = []
+        for difficulty in sorted(self.tiers):
+            stats = self.tiers[difficulty]
+            rates = stats.rates()
+            quantiles = stats.duration_quantiles_ms()
+            lines.append(f"Difficulty {difficulty} ({DIFFICULTY_CONFIG[difficulty]['name']}): {stats.games} games, "
+                         f"win rate {100.0 * rates['win_rate']:.2f}%, lockout rate {100.0 * rates['lockout_rate']:.2f}%, "
+                         f"guesses {stats.guesses.mean:.2f} +/- {stats.guesses.stddev:.2f}, "
+                         f"brackets: {stats.duds_removed} duds removed / {stats.attempts_reset} resets, "
+                         f"duration p50 {quantiles['p50']:.2f} ms p99 {quantiles['p99']:.2f} ms")
+        return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    # Merge JSON exports (e.g. one per server or worker) into one
+    if len(sys.argv) < 3:
+        print("Syntax: hacking_telemetry.py OUTPUT.json|OUTPUT.csv EXPORT.json [EXPORT.json ...]")
+        sys.exit(2)
+    merged = Telemetry()
+    for export_path in sys.argv[2:]:
+        merged.merge(Telemetry.load(export_path))
+    merged.export(sys.argv[1])
+    print(merged.format_report())
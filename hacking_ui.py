@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Curses front end for the Fallout 4 hacking mini-game
+Draws the termlink screen and runs the key loop. Only the interactive and
+server modes import it, so the headless modes never load curses.
+
+The key loop takes every key that is already waiting, applies them as one
+batch (runs of cursor keys collapse into one move) and draws at most one
+frame per 1/fps seconds, so a key-repeat backlog never queues up redraws.
+"""
+
+import curses
+import time
+from typing import Callable, List, Optional, Tuple
+
+from hacking_game import DIFFICULTY_CONFIG, HackingGame, handle_keys
+
+DEFAULT_FPS = 60
+
+# Optional callable given each frame's input-to-paint latency in nanoseconds:
+# from the first key of a batch being read to its frame reaching the terminal.
+# hacking_profile sets it; nothing is measured while it's None.
+paint_latency = None
+
+def draw_header(stdscr, game: HackingGame):
+    config = DIFFICULTY_CONFIG[game.difficulty]
+    
+    stdscr.addstr(0, 0, "Robco industries (tm) termlink protocol")
+    stdscr.addstr(1, 0, "Enter password now")
+    stdscr.addstr(2, 0, "")
+    
+    # Draw attempts with block characters
+    attempts_str = f"{game.attempts_left} attempt(s) left: "
+    blocks = "█ " * game.attempts_left
+    stdscr.addstr(3, 0, attempts_str + blocks)
+    
+    stdscr.addstr(4, 0, "")
+
+
+def _addstr(stdscr, row: int, col: int, text: str, attr: int = 0) -> int:
+    """Write text at (row, col) and return the number of bytes sent"""
+    if not text:
+        return 0
+    try:
+        stdscr.addstr(row, col, text, attr)
+    except curses.error:
+        pass
+    return len(text.encode('utf-8'))
+
+
+def _grid_position(game: HackingGame, line_idx: int, start_row: int) -> Tuple[int, int]:
+    """Screen (row, col) of the address of a grid line"""
+    num_columns = game.geometry.num_columns
+    line = game.grid_lines[line_idx]
+    row = start_row + line_idx // num_columns
+    col_pos = (line_idx % num_columns) * (len(line.address) + len(line.content) + 5)
+    return row, col_pos
+
+
+def _output_col_start(game: HackingGame) -> int:
+    return game.geometry.num_columns * (len(game.grid_lines[0].address) + game.geometry.content_length + 5)
+
+
+def draw_grid_line(stdscr, game: HackingGame, line_idx: int, start_row: int,
+                   highlight: Optional[Tuple[int, int]] = None) -> int:
+    """Draw one grid line in at most three runs: before, inside and after the highlight"""
+    line = game.grid_lines[line_idx]
+    row, col_pos = _grid_position(game, line_idx, start_row)
+    prefix = line.address + ' '
+    content = line.content
+
+    if highlight is None:
+        return _addstr(stdscr, row, col_pos, prefix + content)
+
+    highlight_start, highlight_end = highlight
+    highlight_start = max(0, min(highlight_start, len(content)))
+    highlight_end = max(highlight_start, min(highlight_end, len(content)))
+
+    written = _addstr(stdscr, row, col_pos, prefix + content[:highlight_start])
+    content_col = col_pos + len(prefix)
+    written += _addstr(stdscr, row, content_col + highlight_start,
+                       content[highlight_start:highlight_end], curses.A_REVERSE)
+    written += _addstr(stdscr, row, content_col + highlight_end, content[highlight_end:])
+    return written
+
+
+def draw_grid(stdscr, game: HackingGame, start_row: int):
+    # Draw the columns of content
+    for line_idx in range(len(game.grid_lines)):
+        if line_idx == game.cursor_row:
+            draw_grid_line(stdscr, game, line_idx, start_row, game.get_current_highlight())
+        else:
+            draw_grid_line(stdscr, game, line_idx, start_row)
+    
+    # Draw the output column (third column)
+    output_col_start = _output_col_start(game)
+    
+    # Show one output per row, with newest at the bottom
+    for i, output in enumerate(game.recent_outputs(game.geometry.num_rows)):
+        _addstr(stdscr, start_row + i, output_col_start, "> " + output)
+
+
+class GridRenderer:
+    """Keeps the last frame on screen and only repaints what changed since then.
+
+    Dirty grid lines come from the game (``game.dirty_lines``, filled in by
+    ``activate_bracket``) plus the old and new cursor lines. Everything is
+    flushed once per frame with ``noutrefresh``/``doupdate``.
+    """
+
+    def __init__(self, start_row: int = 5):
+        self.start_row = start_row
+        self.full_redraw = True
+        self.last_cursor_row = -1
+        self.last_highlight = None
+        self.last_attempts = None
+        self.last_outputs = []
+        self.last_output_version = None
+        # Bytes handed to curses, to measure the gain over full redraws
+        self.bytes_last_frame = 0
+        self.bytes_total = 0
+        self.frames = 0
+
+    def invalidate(self):
+        """Force a full repaint on the next frame (e.g. after a terminal resize)"""
+        self.full_redraw = True
+
+    def render(self, stdscr, game: HackingGame) -> int:
+        """Draw one frame and return the number of bytes written"""
+        written = 0
+        highlight = game.get_current_highlight()
+
+        if self.full_redraw:
+            stdscr.erase()
+            written += _addstr(stdscr, 0, 0, "Robco industries (tm) termlink protocol")
+            written += _addstr(stdscr, 1, 0, "Enter password now")
+            dirty = set(range(len(game.grid_lines)))
+            self.last_attempts = None
+            self.last_outputs = []
+            self.last_output_version = None
+        else:
+            dirty = set(game.dirty_lines)
+            if game.cursor_row != self.last_cursor_row or highlight != self.last_highlight:
+                dirty.add(game.cursor_row)
+                if 0 <= self.last_cursor_row < len(game.grid_lines):
+                    dirty.add(self.last_cursor_row)
+        game.dirty_lines.clear()
+
+        # Attempts line
+        if game.attempts_left != self.last_attempts:
+            attempts_str = f"{game.attempts_left} attempt(s) left: " + "█ " * game.attempts_left
+            written += _addstr(stdscr, 3, 0, attempts_str)
+            stdscr.clrtoeol()
+            self.last_attempts = game.attempts_left
+
+        # Grid lines
+        for line_idx in sorted(dirty):
+            if line_idx == game.cursor_row:
+                written += draw_grid_line(stdscr, game, line_idx, self.start_row, highlight)
+            else:
+                written += draw_grid_line(stdscr, game, line_idx, self.start_row)
+
+        # Output column: untouched unless the history changed, then only rows whose text changed
+        if game.output_version != self.last_output_version:
+            outputs = game.recent_outputs(game.geometry.num_rows)
+            output_col_start = _output_col_start(game)
+            for i in range(max(len(outputs), len(self.last_outputs))):
+                row = self.start_row + i
+                if i >= len(outputs):
+                    try:
+                        stdscr.move(row, output_col_start)
+                        stdscr.clrtoeol()
+                    except curses.error:
+                        pass
+                elif i >= len(self.last_outputs) or outputs[i] != self.last_outputs[i]:
+                    written += _addstr(stdscr, row, output_col_start, "> " + outputs[i])
+                    stdscr.clrtoeol()
+            self.last_outputs = outputs
+            self.last_output_version = game.output_version
+
+        self.full_redraw = False
+        self.last_cursor_row = game.cursor_row
+        self.last_highlight = highlight
+        self.bytes_last_frame = written
+        self.bytes_total += written
+        self.frames += 1
+
+        self.flush(stdscr)
+        return written
+
+    def flush(self, stdscr):
+        """Push the frame to the terminal in one update"""
+        stdscr.noutrefresh()
+        curses.doupdate()
+
+
+def draw_final_output(stdscr, game: HackingGame, row: int):
+    # Rows below a tall --geometry can be off the screen, so these writes are clipped
+    if game.won:
+        _addstr(stdscr, row, 0, "ACCESS GRANTED", curses.A_BOLD)
+    elif game.locked_out:
+        # Center the terminal locked message
+        _addstr(stdscr, row + 1, 0, "      TERMINAL LOCKED", curses.A_BOLD)
+        _addstr(stdscr, row + 2, 0, "PLEASE CONTACT ADMINISTRATOR", curses.A_BOLD)
+
+
+def draw_final_screen(stdscr, game: HackingGame, prompt: str):
+    stdscr.clear()
+    
+    if game.locked_out:
+        # Blank screen and show terminal locked message
+        _addstr(stdscr, 1, 0, "      TERMINAL LOCKED", curses.A_BOLD)
+        _addstr(stdscr, 2, 0, "PLEASE CONTACT ADMINISTRATOR", curses.A_BOLD)
+    else:
+        draw_header(stdscr, game)
+        draw_grid(stdscr, game, 5)
+        
+        num_rows = game.geometry.num_rows
+        draw_final_output(stdscr, game, 5 + num_rows + 2)
+    
+    _addstr(stdscr, 5 + game.geometry.num_rows + 4, 0, f"{prompt} (seed {game.seed})")
+
+
+def read_keys(stdscr, timeout_ms: int) -> List[int]:
+    """Wait up to timeout_ms (-1 for ever) for a key, then take every key already pending"""
+    stdscr.timeout(timeout_ms)
+    key = stdscr.getch()
+    if key == -1:
+        return []
+    keys = [key]
+    stdscr.timeout(0)
+    while True:
+        key = stdscr.getch()
+        if key == -1:
+            return keys
+        keys.append(key)
+
+
+def play(stdscr, game: HackingGame, fps: int = DEFAULT_FPS) -> bool:
+    """Run one game; returns True if the player asked to retry.
+
+    A frame goes out as soon as input arrives if the last one is older than
+    1/fps seconds, otherwise once it is; input keeps being applied meanwhile.
+    fps 0 draws after every batch of keys.
+    """
+    renderer = GridRenderer(5)
+    clock = time.perf_counter_ns
+    budget = 1_000_000_000 // fps if fps > 0 else 0
+    
+    renderer.render(stdscr, game)
+    painted_at = clock()
+    input_at = None  # When the first key not yet on screen was read
+    while not game.game_over:
+        timeout = -1  # Nothing to draw, so sleep until a key comes
+        if input_at is not None:
+            wait = painted_at + budget - clock()
+            if wait <= 0:
+                renderer.render(stdscr, game)
+                painted_at = clock()
+                if paint_latency is not None:
+                    paint_latency(painted_at - input_at)
+                input_at = None
+                continue
+            timeout = -(-wait // 1_000_000)
+        
+        keys = read_keys(stdscr, timeout)
+        if not keys:
+            continue
+        if input_at is None:
+            input_at = clock()
+        
+        quit_at = next((i for i, key in enumerate(keys) if key in (ord('q'), ord('Q'))), None)
+        if quit_at is not None:
+            handle_keys(game, keys[:quit_at])
+            break
+        
+        if curses.KEY_RESIZE in keys:
+            renderer.invalidate()
+        
+        handle_keys(game, keys)
+    
+    # Show final state
+    draw_final_screen(stdscr, game, "Press R to retry or any other key to exit...")
+    stdscr.refresh()
+    stdscr.timeout(-1)
+    key = stdscr.getch()
+    return key == ord('r') or key == ord('R')
+
+
+def main(stdscr, difficulty: int, seed: Optional[int] = None,
+         game_factory: Optional[Callable[..., HackingGame]] = None,
+         on_game_end: Optional[Callable[[HackingGame], None]] = None, fps: int = DEFAULT_FPS):
+    """Play games until the player stops retrying; run it with curses.wrapper.
+
+    game_factory(difficulty, seed=seed) makes each game (HackingGame by
+    default) and on_game_end sees every finished or abandoned one. fps caps
+    how often the screen is redrawn (see play).
+    """
+    game_factory = game_factory or HackingGame
+    curses.curs_set(0)
+    stdscr.nodelay(0)
+    stdscr.clear()
+    
+    # The seed only applies to the first game, retries get fresh boards
+    while True:
+        game = game_factory(difficulty, seed=seed)
+        retry = play(stdscr, game, fps)
+        if on_game_end is not None:
+            on_game_end(game)
+        if not retry:
+            break
+        seed = None
+        stdscr.clear()
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Word dictionaries for the hacking mini-game
+Words are validated, uppercased and bucketed by their real length once. Large
+dictionaries are compiled into an on-disk index of fixed-width records that
+games open with mmap, so sampling a board's words only touches those words.
+
+Index file layout (all integers little-endian):
+    8 bytes   magic b'FHWIDX1\\0'
+    4 bytes   number of buckets B
+    B x 16    bucket table: word length (u32), word count (u32), records offset (u64)
+    ...       records, one bucket after another, each word exactly `length` bytes
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections import Counter, OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+MIN_WORD_LEN = 4
+MAX_WORD_LEN = 16  # A word has to fit on one grid line
+
+INDEX_MAGIC = b'FHWIDX1\0'
+_HEADER = struct.Struct('<8sI')
+_BUCKET = struct.Struct('<IIQ')
+
+
+def normalize_word(word: str) -> Optional[str]:
+    """Uppercased word, or None if it can't be used on the board"""
+    word = word.strip().upper()
+    if not (MIN_WORD_LEN <= len(word) <= MAX_WORD_LEN):
+        return None
+    if not word.isascii() or not word.isalpha():
+        return None
+    return word
+
+
+def bucket_words(words: Iterable[str]) -> Dict[int, List[str]]:
+    """Validate words and group them by their actual length, sorted and without duplicates"""
+    buckets = {}
+    for word in words:
+        word = normalize_word(word)
+        if word is not None:
+            buckets.setdefault(len(word), set()).add(word)
+    return {length: sorted(buckets[length]) for length in sorted(buckets)}
+
+
+class WordIndex:
+    """Words bucketed by length; subclasses say where the buckets live"""
+
+    _likeness = None
+    _digest = None
+
+    def count(self, length: int) -> int:
+        raise NotImplementedError
+
+    def word(self, length: int, i: int) -> str:
+        raise NotImplementedError
+
+    def lengths(self) -> List[int]:
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        return sum(self.count(length) for length in self.lengths())
+
+    def sample_ids(self, min_len: int, max_len: int, k: int, rng) -> List[Tuple[int, int]]:
+        """(length, word number) of k distinct words with min_len <= length <= max_len, in O(k) time"""
+        spans = [(length, self.count(length)) for length in range(min_len, max_len + 1)]
+        spans = [(length, n) for length, n in spans if n]
+        total = sum(n for _, n in spans)
+        # Sampling a range picks indices without materialising the population
+        picks = rng.sample(range(total), min(k, total))
+        ids = []
+        for pick in picks:
+            for length, n in spans:
+                if pick < n:
+                    ids.append((length, pick))
+                    break
+                pick -= n
+        return ids
+
+    def sample(self, min_len: int, max_len: int, k: int, rng) -> List[str]:
+        """k distinct words with min_len <= length <= max_len, in O(k) time"""
+        return [self.word(length, i) for length, i in self.sample_ids(min_len, max_len, k, rng)]
+
+    def _bucket_bytes(self, length: int) -> bytes:
+        """A bucket's words back to back, as stored in an index file"""
+        return ''.join(self.word(length, i) for i in range(self.count(length))).encode('ascii')
+
+    def digest(self) -> bytes:
+        """SHA-256 of the words, computed once; equal for equal word sets however they're stored"""
+        if self._digest is None:
+            sha = hashlib.sha256()
+            for length in sorted(self.lengths()):
+                sha.update(_BUCKET.pack(length, self.count(length), 0))
+                sha.update(self._bucket_bytes(length))
+            self._digest = sha.digest()
+        return self._digest
+
+    def likeness_index(self) -> 'LikenessIndex':
+        """Positional letter index over these words, built on first use"""
+        if self._likeness is None:
+            self._likeness = LikenessIndex(self)
+        return self._likeness
+
+
+class LikenessIndex:
+    """Which words have which letter at which position, per length bucket.
+
+    Scoring a password against a bucket only walks the postings for the
+    password's own letters, so the cost is proportional to the number of
+    words sharing a letter with it, not to every pair in the dictionary.
+    """
+
+    def __init__(self, words: WordIndex):
+        self.words = words
+        self.postings = {}  # length -> [{letter: array of word numbers} per position]
+
+    def _bucket_postings(self, length: int) -> List[Dict[str, array]]:
+        postings = self.postings.get(length)
+        if postings is None:
+            postings = [{} for _ in range(length)]
+            for i in range(self.words.count(length)):
+                for pos, letter in enumerate(self.words.word(length, i)):
+                    ids = postings[pos].get(letter)
+                    if ids is None:
+                        ids = postings[pos][letter] = array('I')
+                    ids.append(i)
+            self.postings[length] = postings
+        return postings
+
+    def likeness(self, password: str, min_len: int, max_len: int) -> Dict[int, Dict[int, int]]:
+        """{length: {word number: likeness}} for every word sharing at least one letter position.
+
+        Likeness follows HackingGame.count_matches: positions past the end of
+        the shorter word don't count. Words missing from the result score 0.
+        """
+        result = {}
+        for length in range(min_len, max_len + 1):
+            if not self.words.count(length):
+                continue
+            postings = self._bucket_postings(length)
+            counts = Counter()
+            for pos in range(min(length, len(password))):
+                ids = postings[pos].get(password[pos])
+                if ids is not None:
+                    counts.update(ids)  # Counted in C, not one dict update per id in Python
+            result[length] = counts
+        return result
+
+
+class MemoryWordIndex(WordIndex):
+    """Index over in-memory word lists, such as the built-in WORD_LISTS"""
+
+    def __init__(self, words: Iterable[str]):
+        self.buckets = bucket_words(words)
+
+    @classmethod
+    def from_lists(cls, word_lists: Dict[int, List[str]]) -> 'MemoryWordIndex':
+        """Build from a {length: [words]} dict; words are re-bucketed by their real length"""
+        return cls(word for words in word_lists.values() for word in words)
+
+    def count(self, length: int) -> int:
+        bucket = self.buckets.get(length)
+        return len(bucket) if bucket else 0
+
+    def word(self, length: int, i: int) -> str:
+        return self.buckets[length][i]
+
+    def _bucket_bytes(self, length: int) -> bytes:
+        return ''.join(self.buckets[length]).encode('ascii')
+
+    def lengths(self) -> List[int]:
+        return list(self.buckets)
+
+
+class MmapWordIndex(WordIndex):
+    """Read-only view of an index file; opening it only parses the bucket table"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, num_buckets = _HEADER.unpack_from(self._mm, 0)
+        if magic != INDEX_MAGIC:
+            self._mm.close()
+            raise ValueError(f"{path} is not a word index")
+        self.buckets = {}  # length -> (count, offset)
+        pos = _HEADER.size
+        for _ in range(num_buckets):
+            length, count, offset = _BUCKET.unpack_from(self._mm, pos)
+            self.buckets[length] = (count, offset)
+            pos += _BUCKET.size
+
+    def __reduce__(self):
+        # Worker processes reopen the file instead of pickling the mapping
+        return (MmapWordIndex, (self.path,))
+
+    def close(self):
+        self._mm.close()
+
+    def count(self, length: int) -> int:
+        bucket = self.buckets.get(length)
+        return bucket[0] if bucket else 0
+
+    def word(self, length: int, i: int) -> str:
+        offset = self.buckets[length][1] + i * length
+        return self._mm[offset:offset + length].decode('ascii')
+
+    def _bucket_bytes(self, length: int) -> bytes:
+        count, offset = self.buckets[length]
+        return self._mm[offset:offset + count * length]
+
+    def lengths(self) -> List[int]:
+        return list(self.buckets)
+
+
+def build_index(sources: Iterable[str], out_path: str) -> Tuple[int, int]:
+    """Compile word files (one word per line) into an index; returns (kept, rejected)"""
+    words = []
+    seen = 0
+    for source in sources:
+        with open(source, encoding='utf-8', errors='replace') as f:
+            for line in f:
+                if line.strip():
+                    seen += 1
+                    words.append(line)
+    buckets = bucket_words(words)
+
+    table = b''
+    offset = _HEADER.size + _BUCKET.size * len(buckets)
+    for length, bucket in buckets.items():
+        table += _BUCKET.pack(length, len(bucket), offset)
+        offset += length * len(bucket)
+
+    tmp_path = out_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(INDEX_MAGIC, len(buckets)))
+        f.write(table)
+        for bucket in buckets.values():
+            f.write(''.join(bucket).encode('ascii'))
+    os.replace(tmp_path, out_path)  # Readers never see a half-written index
+
+    kept = sum(len(bucket) for bucket in buckets.values())
+    return kept, seen - kept
+
+
+def is_index(path: str) -> bool:
+    with open(path, 'rb') as f:
+        return f.read(len(INDEX_MAGIC)) == INDEX_MAGIC
+
+
+def open_dictionary(path: str) -> MmapWordIndex:
+    """Open a word index, compiling a plain word list to PATH.idx first if needed"""
+    if is_index(path):
+        return MmapWordIndex(path)
+    index_path = path + '.idx'
+    if not os.path.exists(index_path) or os.path.getmtime(index_path) < os.path.getmtime(path):
+        build_index([path], index_path)
+    return MmapWordIndex(index_path)
+
+
+MEMORY_INDEXES = 16  # Word list dicts whose indexes are kept, least recently used dropped first
+_memory_indexes = OrderedDict()  # word list contents -> MemoryWordIndex
+
+
+def word_index(word_lists) -> WordIndex:
+    """WordIndex for a WordIndex or a {length: [words]} dict.
+
+    Dict indexes are cached by the dict's contents, so a dict changed since
+    is indexed again and equal dicts share one index. Reading the contents
+    costs a few microseconds for the built-in words; large word lists
+    should be a WordIndex (see open_dictionary) instead.
+    """
+    if isinstance(word_lists, WordIndex):
+        return word_lists
+    key = tuple((length, tuple(words)) for length, words in sorted(word_lists.items()))
+    index = _memory_indexes.get(key)
+    if index is None:
+        index = _memory_indexes[key] = MemoryWordIndex.from_lists(word_lists)
+        if len(_memory_indexes) > MEMORY_INDEXES:
+            _memory_indexes.popitem(last=False)
+    else:
+        _memory_indexes.move_to_end(key)
+    return index
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 3:
+        print("Syntax: hacking_words.py OUTPUT.idx WORDFILE [WORDFILE ...]")
+        sys.exit(2)
+    kept, rejected = build_index(sys.argv[2:], sys.argv[1])
+    print(f"Indexed {kept} words into {sys.argv[1]} ({rejected} rejected or duplicate)")
@@ -0,0 +1,44 @@
+"""The bracket scanner against a direct reading of the pairing rule"""
+
+import random
+
+from hacking_game import BRACKET_PAIRS, HackingGame, scan_brackets
+
+ALPHABET = '()[]{}<>AZ.:$'
+
+
+def brute_force(line: str) -> dict:
+    """Each opener pairs with the first closer of its kind to its right, if no letter comes first"""
+    found = {}
+    for start, char in enumerate(line):
+        for pair in BRACKET_PAIRS:
+            if char != pair[0]:
+                continue
+            for end in range(start + 1, len(line)):
+                if line[end].isalpha():
+                    break
+                if line[end] == pair[1]:
+                    found[start] = (start, end, pair)
+                    break
+    return found
+
+
+def test_scanner_matches_rule():
+    rng = random.Random(0)
+    for _ in range(20000):
+        line = ''.join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 20)))
+        assert scan_brackets(line.encode('latin-1')) == brute_force(line), line
+
+
+def test_examples():
+    assert scan_brackets(b'.(..)..') == {1: (1, 4, '()')}
+    assert scan_brackets(b'((.)') == {0: (0, 3, '()'), 1: (1, 3, '()')}  # Openers can share a closer
+    assert scan_brackets(b'(A)') == {}  # A letter in between breaks the pair
+    assert scan_brackets(b'<[>]') == {0: (0, 2, '<>'), 1: (1, 3, '[]')}  # Other kinds don't interfere
+    assert scan_brackets(b')(') == {}
+
+
+def test_grid_lines_use_rule():
+    for seed in range(50):
+        for line in HackingGame(seed % 5 + 1, seed=seed).grid_lines:
+            assert line.brackets() == brute_force(line.content)
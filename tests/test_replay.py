@@ -0,0 +1,96 @@
+"""Event log round trip: games written to a log replay to the same state"""
+
+import random
+
+import pytest
+
+from hacking_game import EVENT, GENERATOR_VERSION, Geometry, HackingGame, handle_key
+from hacking_replay import (STATUS_LOCKED_OUT, STATUS_UNFINISHED, STATUS_WON, EventLogWriter, GameMemo,
+                            GameRecord, ReplayError, read_log, replay)
+from hacking_words import MemoryWordIndex
+
+KEYS = [9, 9, 9, 258, 261, 10]  # Tab, Tab, Tab, down, right, Enter
+GEOMETRIES = [None, Geometry(30, 3, 16), Geometry(10, 4, 20)]
+
+
+def played_games():
+    rng = random.Random(1)
+    games = []
+    for i in range(60):
+        game = HackingGame(rng.randint(1, 5), seed=i % 20, record_events=True, geometry=GEOMETRIES[i % 3])
+        for _ in range(rng.randint(0, 60)):
+            if game.game_over:
+                break
+            handle_key(game, rng.choice(KEYS))
+        games.append(game)
+    return games
+
+
+def state(game: HackingGame) -> tuple:
+    return (game.attempts_left, game.cursor_row, game.cursor_col, game.won, game.locked_out,
+            game.last_match_count, [line.content for line in game.grid_lines], sorted(game.dud_lines))
+
+
+@pytest.fixture
+def log(tmp_path):
+    games = played_games()
+    path = str(tmp_path / 'games.log')
+    writer = EventLogWriter(path)
+    for game in games:
+        writer.write(game)
+    writer.close()
+    return path, games
+
+
+def test_write_read_replay(log):
+    path, games = log
+    records = list(read_log(path))
+    assert len(records) == len(games)
+    memo = GameMemo(max_games=8)
+    for record, game in zip(records, games):
+        assert (record.difficulty, record.seed, record.geometry) == (game.difficulty, game.seed, game.geometry)
+        assert record.events == bytes(game.events)
+        status = STATUS_WON if game.won else STATUS_LOCKED_OUT if game.locked_out else STATUS_UNFINISHED
+        assert record.status == status
+        assert state(replay(record)) == state(game)
+        assert state(replay(record, memo=memo)) == state(game)
+
+
+def test_partial_replay_matches_prefix(log):
+    path, games = log
+    for record, game in zip(read_log(path), games):
+        if len(record) < 2:
+            continue
+        steps = len(record) // 2
+        prefix = GameRecord(record.difficulty, record.status, record.seed, record.events[:steps * EVENT.size],
+                            record.geometry)
+        assert state(replay(record, steps=steps)) == state(replay(prefix))
+
+
+def test_truncated_log_drops_last_record(log):
+    path, games = log
+    with open(path, 'rb+') as f:
+        f.truncate(f.seek(0, 2) - 1)
+    assert len(list(read_log(path))) == len(games) - 1
+
+
+def test_other_generator_or_word_list_refused(log):
+    path, _ = log
+    record = next(read_log(path))
+    record.generator_version = GENERATOR_VERSION - 1
+    with pytest.raises(ReplayError):
+        replay(record)
+    record.generator_version = GENERATOR_VERSION
+    other_words = MemoryWordIndex.from_lists({n: [chr(65 + i) * n for i in range(20)] for n in range(4, 13)})
+    with pytest.raises(ReplayError):
+        replay(record, other_words)
+
+
+def test_old_logs_refused(tmp_path):
+    for magic in (b'FHLOG1\0\0', b'FHLOG2\0\0'):
+        path = tmp_path / 'old.log'
+        path.write_bytes(magic)
+        with pytest.raises(ValueError, match='older generator'):
+            list(read_log(str(path)))
+        with pytest.raises(ValueError):
+            EventLogWriter(str(path))
@@ -0,0 +1,41 @@
+"""Simulation sweeps: results depend only on the seed, never on the worker count"""
+
+from hacking_sim import CHUNK_SIZE, derive_seed, run_parallel, sweep
+from hacking_telemetry import Telemetry, TierStats
+
+NUM_GAMES = CHUNK_SIZE + 200  # Two chunks, the second one partial
+
+
+def _sweep(workers: int, telemetry=None) -> dict:
+    results = sweep(NUM_GAMES, [1, 3], ['random', 'brackets'], seed=7, workers=workers, telemetry=telemetry)
+    return {key: stats.to_dict() for key, stats in results.items()}
+
+
+def test_sweep_same_for_any_worker_count():
+    assert _sweep(1) == _sweep(4)
+
+
+def test_telemetry_same_for_any_worker_count():
+    inline, pooled = Telemetry(), Telemetry()
+    _sweep(1, inline)
+    _sweep(4, pooled)
+    assert sorted(inline.tiers) == sorted(pooled.tiers) == [1, 3]
+    for difficulty, stats in inline.tiers.items():
+        other = pooled.tiers[difficulty]
+        # Durations are wall-clock times, everything counted is exact
+        for name in TierStats.COUNTERS:
+            assert getattr(stats, name) == getattr(other, name)
+        assert stats.guess_histogram.counts == other.guess_histogram.counts
+        assert stats.guesses.count == other.guesses.count == 2 * NUM_GAMES
+
+
+def test_seed_decides_results():
+    first = run_parallel(300, 2, 'eliminate', seed=1, workers=1).to_dict()
+    assert run_parallel(300, 2, 'eliminate', seed=1, workers=1).to_dict() == first
+    assert run_parallel(300, 2, 'eliminate', seed=2, workers=1).to_dict() != first
+
+
+def test_derive_seed_is_stable():
+    assert derive_seed(7, 3, 'default', 'random', 0) == derive_seed(7, 3, 'default', 'random', 0)
+    assert derive_seed(7, 3, 'default', 'random', 0) != derive_seed(7, 3, 'default', 'random', 1)
+    assert 0 <= derive_seed(0) < 1 << 64
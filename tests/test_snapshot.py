@@ -0,0 +1,72 @@
+"""Copy-on-write snapshots and forks of a HackingGame"""
+
+import random
+
+from hacking_game import HackingGame, handle_key
+
+KEYS = [9, 9, 9, 258, 261, 10]  # Tab, Tab, Tab, down, right, Enter
+
+
+def state(game: HackingGame) -> tuple:
+    return (game.attempts_left, game.cursor_row, game.cursor_col, game.game_over, game.won, game.locked_out,
+            game.last_guess, game.last_match_count, game.replenish_bracket_used,
+            [line.content for line in game.grid_lines], [line.removed for line in game.grid_lines],
+            sorted(game.dud_lines), sorted(game.removed_words), sorted(game.bracket_lines),
+            list(game.word_cells), list(game.token_cells), list(game.output_history))
+
+
+def play(game: HackingGame, seed: int, keys: int = 40):
+    rng = random.Random(seed)
+    for _ in range(keys):
+        if game.game_over:
+            return
+        handle_key(game, rng.choice(KEYS))
+
+
+def test_restore_undoes_every_change():
+    for seed in range(30):
+        game = HackingGame(3, seed=seed)
+        play(game, seed, 10)
+        before = state(game)
+        snapshot = game.snapshot()
+        play(game, seed + 1000)
+        game.restore(snapshot)
+        assert state(game) == before
+        # A snapshot can be restored again, and play goes the same way both times
+        play(game, seed + 1000)
+        after = state(game)
+        game.restore(snapshot)
+        play(game, seed + 1000)
+        assert state(game) == after
+
+
+def test_fork_is_independent():
+    for seed in range(30):
+        game = HackingGame(2, seed=seed)
+        play(game, seed, 5)
+        before = state(game)
+        fork = game.fork()
+        assert state(fork) == before
+        play(fork, seed + 1)
+        assert state(game) == before
+        play(game, seed + 2)
+        fork_state = state(fork)
+        # Forks of forks, and restoring the parent's snapshot into a fork
+        snapshot = game.snapshot()
+        grandchild = fork.fork()
+        play(grandchild, seed + 3)
+        assert state(fork) == fork_state
+        grandchild.restore(snapshot)
+        assert state(grandchild) == state(game)
+
+
+def test_fork_from_snapshot_matches_fresh_game():
+    pristine = HackingGame(4, seed=99)
+    snapshot = pristine.snapshot()
+    fresh = HackingGame(4, seed=99)
+    play(fresh, 5)
+    for _ in range(3):
+        fork = pristine.fork(snapshot)
+        play(fork, 5)
+        assert state(fork) == state(fresh)
+    assert state(pristine) == state(HackingGame(4, seed=99))